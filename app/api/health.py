@@ -1,20 +1,55 @@
 """Health check API endpoints."""
 
 from fastapi import APIRouter
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, Optional, Callable, Awaitable
+import asyncio
 import logging
+import time
 
-from ..services.glossary_service import GlossaryService
-from ..services.query_executor import QueryExecutor
+from ..services._singletons import get_glossary_service, get_query_executor
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/health", tags=["health"])
 
-# Initialize services for health checks
-glossary_service = GlossaryService()
-query_executor = QueryExecutor()
+# Shared services for health checks
+glossary_service = get_glossary_service()
+query_executor = get_query_executor()
+
+# Per-probe timeout for detailed health checks
+CHECK_TIMEOUT_SECONDS = 2.0
+
+# How long health/metrics responses are reused for polling clients
+CACHE_TTL_SECONDS = 2.0
+
+
+class _HealthCache:
+    """Short-lived cache for a single health payload."""
+    
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.payload: Optional[Dict[str, Any]] = None
+        self.expires_at = 0.0
+        self.lock = asyncio.Lock()
+    
+    async def get_or_compute(self, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return cached payload or compute and store a fresh one."""
+        if self.payload is not None and time.monotonic() < self.expires_at:
+            return self.payload
+        
+        async with self.lock:
+            # Another request may have refreshed the payload while we waited
+            if self.payload is not None and time.monotonic() < self.expires_at:
+                return self.payload
+            
+            self.payload = await compute()
+            self.expires_at = time.monotonic() + self.ttl
+            return self.payload
+
+
+_detailed_cache = _HealthCache()
+_metrics_cache = _HealthCache()
 
 
 @router.get("/")
@@ -27,9 +62,49 @@ async def health_check() -> Dict[str, Any]:
     }
 
 
+async def _check_glossary() -> Tuple[str, Dict[str, Any]]:
+    """Check glossary service."""
+    glossary = glossary_service.get_glossary()
+    counts = glossary_service.counts
+    return "glossary", {
+        "status": "healthy",
+        "version": glossary.version,
+        "terms_count": counts["terms_count"],
+        "tables_count": counts["table_mappings_count"]
+    }
+
+
+async def _check_db() -> Tuple[str, Dict[str, Any]]:
+    """Check database connection without blocking the event loop."""
+    db_healthy = await asyncio.wait_for(
+        asyncio.to_thread(query_executor.test_connection),
+        timeout=CHECK_TIMEOUT_SECONDS
+    )
+    return "database", {
+        "status": "healthy" if db_healthy else "unhealthy",
+        "connection": "ok" if db_healthy else "failed"
+    }
+
+
+async def _check_openai() -> Tuple[str, Dict[str, Any]]:
+    """Check OpenAI API configuration."""
+    if not settings.openai_api_key:
+        return "openai", {"status": "not_configured"}
+    # Simple check - in production, you might want to make a test call
+    return "openai", {
+        "status": "configured",
+        "model": settings.openai_model
+    }
+
+
 @router.get("/detailed")
 async def detailed_health_check() -> Dict[str, Any]:
     """Detailed health check with service status."""
+    return await _detailed_cache.get_or_compute(_run_detailed_checks)
+
+
+async def _run_detailed_checks() -> Dict[str, Any]:
+    """Run all service probes and aggregate their status."""
     health_status = {
         "status": "healthy",
         "service": "bi-gpt",
@@ -37,55 +112,25 @@ async def detailed_health_check() -> Dict[str, Any]:
         "checks": {}
     }
     
-    # Check glossary service
-    try:
-        glossary = glossary_service.get_glossary()
-        health_status["checks"]["glossary"] = {
-            "status": "healthy",
-            "version": glossary.version,
-            "terms_count": len(glossary.terms),
-            "tables_count": len(glossary.table_mappings)
-        }
-    except Exception as e:
-        health_status["checks"]["glossary"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    # Run all probes concurrently so latency is bounded by the slowest one
+    checks = [("glossary", _check_glossary), ("database", _check_db), ("openai", _check_openai)]
+    results = await asyncio.gather(*(check() for _, check in checks), return_exceptions=True)
     
-    # Check database connection
-    try:
-        db_healthy = query_executor.test_connection()
-        health_status["checks"]["database"] = {
-            "status": "healthy" if db_healthy else "unhealthy",
-            "connection": "ok" if db_healthy else "failed"
-        }
-        if not db_healthy:
-            health_status["status"] = "unhealthy"
-    except Exception as e:
-        health_status["checks"]["database"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        health_status["status"] = "unhealthy"
-    
-    # Check OpenAI API (if configured)
-    if settings.openai_api_key:
-        try:
-            # Simple check - in production, you might want to make a test call
-            health_status["checks"]["openai"] = {
-                "status": "configured",
-                "model": settings.openai_model
-            }
-        except Exception as e:
-            health_status["checks"]["openai"] = {
+    for (name, _), result in zip(checks, results):
+        if isinstance(result, BaseException):
+            error = str(result) or type(result).__name__
+            health_status["checks"][name] = {
                 "status": "unhealthy",
-                "error": str(e)
+                "error": error
             }
-    else:
-        health_status["checks"]["openai"] = {
-            "status": "not_configured"
-        }
+        else:
+            health_status["checks"][name] = result[1]
+    
+    # Aggregate status: database failure is fatal, glossary failure degrades
+    if health_status["checks"]["database"]["status"] != "healthy":
+        health_status["status"] = "unhealthy"
+    elif health_status["checks"]["glossary"]["status"] != "healthy":
+        health_status["status"] = "degraded"
     
     return health_status
 
@@ -93,15 +138,21 @@ async def detailed_health_check() -> Dict[str, Any]:
 @router.get("/metrics")
 async def get_metrics() -> Dict[str, Any]:
     """Get basic metrics."""
+    return await _metrics_cache.get_or_compute(_collect_metrics)
+
+
+async def _collect_metrics() -> Dict[str, Any]:
+    """Collect glossary metrics."""
     try:
         glossary = glossary_service.get_glossary()
+        counts = glossary_service.counts
         
         return {
             "glossary_version": glossary.version,
-            "business_terms_count": len(glossary.terms),
-            "table_mappings_count": len(glossary.table_mappings),
-            "pii_columns_count": len(glossary.get_pii_columns()),
-            "permitted_tables_count": len(glossary.get_permitted_tables())
+            "business_terms_count": counts["terms_count"],
+            "table_mappings_count": counts["table_mappings_count"],
+            "pii_columns_count": counts["pii_columns_count"],
+            "permitted_tables_count": counts["permitted_tables_count"]
         }
     except Exception as e:
         logger.error(f"Failed to get metrics: {e}")
@@ -1,17 +1,26 @@
 """Metrics API endpoints."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import Dict, Any, List
+import hashlib
 import logging
 
-from ..core.metrics import metrics_collector
+from ..core.metrics import metrics_collector, render_prometheus
 from ..core.logging import query_logger, audit_logger
+from ..core.responses import FastJSONResponse, dumps_json
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
 
 
+@router.get("/prometheus", include_in_schema=False)
+async def get_prometheus_metrics() -> Response:
+    """Expose Prometheus counters and histograms for scraping."""
+    body, content_type = render_prometheus()
+    return Response(content=body, media_type=content_type)
+
+
 @router.get("/overall")
 async def get_overall_metrics() -> Dict[str, Any]:
     """Get overall system metrics."""
@@ -32,7 +41,7 @@ async def get_user_metrics(user_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail="Failed to retrieve user metrics")
 
 
-@router.get("/hourly")
+@router.get("/hourly", response_class=FastJSONResponse)
 async def get_hourly_stats(hours: int = 24) -> List[Dict[str, Any]]:
     """Get hourly statistics."""
     try:
@@ -47,7 +56,7 @@ async def get_hourly_stats(hours: int = 24) -> List[Dict[str, Any]]:
         raise HTTPException(status_code=500, detail="Failed to retrieve hourly statistics")
 
 
-@router.get("/recent")
+@router.get("/recent", response_class=FastJSONResponse)
 async def get_recent_queries(limit: int = 10) -> List[Dict[str, Any]]:
     """Get recent queries."""
     try:
@@ -83,16 +92,27 @@ async def get_performance_metrics() -> Dict[str, Any]:
 
 
 @router.get("/dashboard")
-async def get_dashboard_metrics() -> Dict[str, Any]:
-    """Get comprehensive dashboard metrics."""
+async def get_dashboard_metrics(request: Request) -> Response:
+    """Get comprehensive dashboard metrics.
+    
+    Responses carry an ETag; clients sending a matching If-None-Match
+    header get 304 Not Modified instead of the full payload.
+    """
     try:
-        return {
+        body = dumps_json({
             "overall": metrics_collector.get_overall_metrics(),
             "security": metrics_collector.get_security_metrics(),
             "performance": metrics_collector.get_performance_metrics(),
             "recent_queries": metrics_collector.get_recent_queries(5),
             "hourly_stats": metrics_collector.get_hourly_stats(24)
-        }
+        })
     except Exception as e:
         logger.error(f"Failed to get dashboard metrics: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve dashboard metrics")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to retrieve dashboard metrics")
+    
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -1,46 +1,69 @@
 """Query API endpoints."""
 
+import asyncio
+import os
+import re
+import time
 import uuid
-from typing import Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 import logging
+import yaml
 
-from ..models.query import QueryRequest, QueryResponse, QueryStatus, QueryExplanation
-from ..models.security import AuditLog
+from ..models.query import QueryRequest, QueryResponse, QueryResult, QueryStatus, QueryExplanation
+from ..models.security import AuditLog, SecurityCheck, PIIFlag
+from ..core.metrics import metrics_collector, QueryMetrics, observe_query
 from ..services.glossary_service import GlossaryService
-from ..services.sql_generator import SQLGenerator
-from ..services.security_service import SecurityService
-from ..services.query_executor import QueryExecutor
+from ..services.term_matcher import TermMatcher
+from ..services.sql_parser import ParsedSQL, analyze_sql
+from ..services._singletons import (
+    get_glossary_service,
+    get_sql_generator,
+    get_security_service,
+    get_query_executor,
+    get_query_cache,
+)
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/query", tags=["query"])
 
-# Initialize services
-glossary_service = GlossaryService()
+# libyaml-backed loader when available, pure-Python otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# SQL fragments used to build query explanations
+_TABLE_RE = re.compile(r'\bFROM\s+(\w+)|JOIN\s+(\w+)', re.IGNORECASE)
+_WHERE_RE = re.compile(r'WHERE\s+(.*?)(?:\s+GROUP\s+BY|\s+ORDER\s+BY|\s+LIMIT|$)', re.IGNORECASE | re.DOTALL)
+
+# Shared services
+glossary_service = get_glossary_service()
 glossary = glossary_service.get_glossary()
-sql_generator = SQLGenerator(glossary)
-security_service = SecurityService(glossary)
-query_executor = QueryExecutor()
+sql_generator = get_sql_generator()
+security_service = get_security_service()
+query_executor = get_query_executor()
+query_cache = get_query_cache()
 
 
 
 @router.post("/", response_model=QueryResponse)
 async def execute_query(request: QueryRequest) -> QueryResponse:
-    request_id = str(uuid.uuid4())
+    request_id = uuid.uuid4().hex
 
     # Check if OpenAI API key is configured
     if not settings.openai_api_key or settings.openai_api_key == "your_openai_api_key_here":
         # Demo mode - return example SQL for common questions
-        demo_result = _get_demo_sql(request.question)
+        question_lower = request.question.lower()
+        demo_result = _get_demo_sql(question_lower)
         if demo_result:
             return QueryResponse(
                 request_id=request_id,
                 status=QueryStatus.COMPLETED,
                 result=demo_result,
-                explanation=_generate_demo_explanation(request.question, demo_result.sql_query)
+                explanation=_generate_demo_explanation(question_lower, demo_result.sql_query)
             )
         else:
             return QueryResponse(
@@ -51,27 +74,53 @@ async def execute_query(request: QueryRequest) -> QueryResponse:
                 explanation=None
             )
 
+    sql_result: Dict[str, Any] = {}
+    security_check: Optional[SecurityCheck] = None
+
     try:
-        # Generate SQL from question
-        sql_result = sql_generator.generate_sql(request)
-        if not sql_result.get("sql"):
-            raise Exception(sql_result.get("error", "Failed to generate SQL"))
+        # Reuse SQL generated earlier for the same role and question
+        cached = await asyncio.to_thread(query_cache.get, request.user_role, request.question)
+        if cached:
+            sql_result = {"sql": cached["sql"], "confidence": cached["confidence"]}
+        else:
+            # Generate SQL from question
+            sql_result = await sql_generator.generate_sql_async(request)
+            if not sql_result.get("sql"):
+                raise Exception(sql_result.get("error", "Failed to generate SQL"))
 
         # Security check
-        security_check = security_service.check_query_security(sql_result["sql"], request.user_role)
+        security_check = await asyncio.to_thread(
+            security_service.check_query_security, sql_result["sql"], request.user_role
+        )
         if not security_check.is_safe:
             raise Exception("Query failed security check: " + "; ".join(security_check.warnings))
 
+        # Parse once for execution and explanation
+        parsed = await asyncio.to_thread(analyze_sql, sql_result["sql"])
+        
         # Execute query
-        query_result = query_executor.execute_query(sql_result["sql"])
+        query_result = await asyncio.to_thread(
+            query_executor.execute_query, sql_result["sql"], parsed=parsed
+        )
 
-        # Generate explanation
-        explanation = _generate_explanation(request.question, sql_result["sql"], glossary_service)
+        if cached:
+            explanation = QueryExplanation(**cached["explanation"])
+        else:
+            # Generate explanation
+            explanation = await asyncio.to_thread(
+                _generate_explanation, request.question, sql_result["sql"], glossary_service, parsed
+            )
+            await asyncio.to_thread(query_cache.set, request.user_role, request.question, {
+                "sql": sql_result["sql"],
+                "confidence": sql_result.get("confidence", 0.0),
+                "explanation": explanation.model_dump()
+            })
 
         # Audit log (example, should be saved somewhere)
         audit_log = AuditLog(
+            request_id=request_id,
             user_id=request.user_id,
-            timestamp=str(uuid.uuid4()),  # Should be a real timestamp
+            timestamp=time.time_ns(),
             original_question=request.question,
             generated_sql=sql_result["sql"],
             security_check=security_check,
@@ -79,6 +128,7 @@ async def execute_query(request: QueryRequest) -> QueryResponse:
             row_count=query_result.row_count
         )
         logger.info(f"Query executed successfully: {audit_log}")
+        _record_query(request, request_id, sql_result, security_check, query_result.execution_time_ms, query_result.row_count)
 
         return QueryResponse(
             request_id=request_id,
@@ -89,22 +139,13 @@ async def execute_query(request: QueryRequest) -> QueryResponse:
 
     except Exception as e:
         logger.error(f"Query execution failed {request_id}: {e}")
+        _record_query(request, request_id, sql_result, security_check, error_message=str(e))
         
         # Определяем тип ошибки и показываем понятное сообщение
-        error_message = str(e)
-        if "API key" in error_message or "401" in error_message:
-            user_message = "Service temporarily unavailable: OpenAI API key not configured. Please contact administrator."
-        elif "database" in error_message.lower() or "connection" in error_message.lower():
-            user_message = "Database temporarily unavailable. Please try again later or contact support."
-        elif "timeout" in error_message.lower():
-            user_message = "Request timeout. Please try with a simpler query or contact support."
-        else:
-            user_message = "Service temporarily unavailable. Please try again later or contact support."
-        
         return QueryResponse(
             request_id=request_id,
             status=QueryStatus.FAILED,
-            error_message=user_message,
+            error_message=_user_error_message(str(e)),
             result=None
         )
 
@@ -126,7 +167,7 @@ async def validate_query(request: QueryRequest) -> Dict[str, Any]:
     """Validate query without executing."""
     try:
         # Generate SQL
-        sql_result = sql_generator.generate_sql(request)
+        sql_result = await sql_generator.generate_sql_async(request)
         
         if not sql_result.get("sql"):
             return {
@@ -136,12 +177,13 @@ async def validate_query(request: QueryRequest) -> Dict[str, Any]:
             }
         
         sql = sql_result["sql"]
+        parsed = await asyncio.to_thread(analyze_sql, sql)
         
         # Security check
-        security_check = security_service.check_query_security(sql, request.user_role)
+        security_check = await asyncio.to_thread(security_service.check_query_security, sql, request.user_role)
         
         # Syntax validation
-        syntax_valid = query_executor.validate_query_syntax(sql)
+        syntax_valid = await asyncio.to_thread(query_executor.validate_query_syntax, sql, parsed)
         
         return {
             "valid": syntax_valid and security_check.is_safe,
@@ -164,21 +206,64 @@ async def validate_query(request: QueryRequest) -> Dict[str, Any]:
         }
 
 
-def _generate_explanation(question: str, sql: str, glossary_service: GlossaryService) -> QueryExplanation:
+def _record_query(
+    request: QueryRequest,
+    request_id: str,
+    sql_result: Dict[str, Any],
+    security_check: Optional[SecurityCheck],
+    execution_time_ms: Optional[float] = None,
+    row_count: int = 0,
+    error_message: Optional[str] = None
+) -> None:
+    """Record query outcome in the metrics collector and Prometheus."""
+    pii_detected = security_check is not None and security_check.pii_flag != PIIFlag.NONE
+    metrics_collector.submit(QueryMetrics(
+        request_id=request_id,
+        user_id=request.user_id,
+        question=request.question,
+        sql_generated=bool(sql_result.get("sql")),
+        sql_executed=execution_time_ms is not None,
+        execution_time_ms=execution_time_ms or 0.0,
+        row_count=row_count,
+        confidence_score=sql_result.get("confidence", 0.0),
+        security_level=security_check.level.value if security_check else "unknown",
+        pii_detected=pii_detected,
+        error_message=error_message
+    ))
+    observe_query(
+        QueryStatus.FAILED.value if error_message else QueryStatus.COMPLETED.value,
+        request.user_role,
+        execution_time_ms,
+        pii_detected
+    )
+
+
+def _generate_explanation(
+    question: str,
+    sql: str,
+    glossary_service: GlossaryService,
+    parsed: Optional[ParsedSQL] = None
+) -> QueryExplanation:
     """Generate explanation for the query."""
     # Extract business terms used
     terms = glossary_service.extract_business_terms(question)
     business_terms = [term.canonical_name for term in terms]
     
-    # Extract tables used from SQL
-    import re
-    table_pattern = r'\bFROM\s+(\w+)|JOIN\s+(\w+)'
-    tables_used = list(set(re.findall(table_pattern, sql, re.IGNORECASE)))
-    tables_used = [table[0] or table[1] for table in tables_used]
+    if parsed is None:
+        parsed = analyze_sql(sql)
     
-    # Extract filters
-    where_match = re.search(r'WHERE\s+(.*?)(?:\s+GROUP\s+BY|\s+ORDER\s+BY|\s+LIMIT|$)', sql, re.IGNORECASE | re.DOTALL)
-    filters_applied = [where_match.group(1).strip()] if where_match else []
+    if parsed is not None:
+        # Tables and filters from the parsed SQL
+        tables_used = list(parsed.tables)
+        filters_applied = [parsed.where] if parsed.where else []
+    else:
+        # Extract tables used from SQL
+        tables_used = list(set(_TABLE_RE.findall(sql)))
+        tables_used = [table[0] or table[1] for table in tables_used]
+        
+        # Extract filters
+        where_match = _WHERE_RE.search(sql)
+        filters_applied = [where_match.group(1).strip()] if where_match else []
     
     # Generate assumptions
     assumptions = []
@@ -202,67 +287,170 @@ def _generate_explanation(question: str, sql: str, glossary_service: GlossarySer
     )
 
 
-def _get_demo_sql(question: str):
-    """Get demo SQL for common questions when OpenAI API is not configured."""
-    from ..models.query import QueryResult
-    import yaml
-    import os
+# User-facing messages by error category, in order of precedence
+_ERROR_MESSAGES = {
+    "api_key": "Service temporarily unavailable: OpenAI API key not configured. Please contact administrator.",
+    "database": "Database temporarily unavailable. Please try again later or contact support.",
+    "timeout": "Request timeout. Please try with a simpler query or contact support.",
+}
+_DEFAULT_ERROR_MESSAGE = "Service temporarily unavailable. Please try again later or contact support."
+_ERROR_CATEGORY_RE = re.compile(
+    r"(?P<api_key>api key|401)|(?P<database>database|connection)|(?P<timeout>timeout)",
+    re.IGNORECASE
+)
+
+
+def _user_error_message(error_message: str) -> str:
+    """Map an internal error message to a user-facing one in a single scan."""
+    categories = {match.lastgroup for match in _ERROR_CATEGORY_RE.finditer(error_message)}
+    for category, message in _ERROR_MESSAGES.items():
+        if category in categories:
+            return message
+    return _DEFAULT_ERROR_MESSAGE
+
+
+# Russian question keywords that boost golden queries, as (keyword, field, value).
+# A query is boosted when the keyword is in the question and value is in the
+# query's field; only the first matching rule counts for each query.
+_KEYWORD_RULES = (
+    ("прибыль", "business_terms", "gross_profit"),
+    ("выручка", "business_terms", "revenue"),
+    ("товар", "natural_language", "product"),
+    ("магазин", "business_terms", "store"),
+    ("регион", "business_terms", "region"),
+    ("клиент", "business_terms", "customer"),
+    ("конверсия", "business_terms", "conversion"),
+)
+
+# Russian question keywords reported as business terms in demo explanations
+_DEMO_BUSINESS_TERMS = {
+    "прибыль": "gross_profit",
+    "выручка": "revenue",
+    "товар": "product",
+    "магазин": "store",
+    "регион": "region",
+    "клиент": "customer",
+    "конверсия": "conversion_rate",
+}
+_DEMO_TERM_MATCHER = TermMatcher(_DEMO_BUSINESS_TERMS.items())
+
+
+@dataclass(frozen=True)
+class _GoldenQuery:
+    """Golden query pre-processed for demo matching."""
+    position: int
+    business_terms: Tuple[str, ...]
+    terms_lower: Tuple[str, ...]
+    natural_language: str
+    words: Tuple[str, ...]
+    expected_sql: str
+    expected_columns: Tuple[str, ...]
+    execution_time_ms: int
+
+
+@dataclass(frozen=True)
+class _GoldenIndex:
+    """Golden queries with indexes that find the ones a question can match."""
+    queries: List[_GoldenQuery]
+    # Business terms and natural-language words of every query
+    matcher: TermMatcher
+    # Queries eligible for each keyword rule
+    rule_index: Dict[str, List[_GoldenQuery]]
+    # Queries with a blank business term, which matches every question
+    always: List[_GoldenQuery]
+
+
+@lru_cache(maxsize=1)
+def _load_golden() -> _GoldenIndex:
+    """Load golden queries and build matching indexes once per process."""
+    golden_queries_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "golden_queries.yaml")
+    with open(golden_queries_path, 'r', encoding='utf-8') as f:
+        golden_data = yaml.load(f, Loader=_YAML_LOADER)
+    
+    queries = []
+    for position, query in enumerate(golden_data.get('queries', [])):
+        business_terms = tuple(query.get('business_terms', []))
+        natural_language = query.get('natural_language', '').lower()
+        queries.append(_GoldenQuery(
+            position=position,
+            business_terms=business_terms,
+            terms_lower=tuple(term.lower() for term in business_terms),
+            natural_language=natural_language,
+            words=tuple(natural_language.split()),
+            expected_sql=query['expected_sql'].strip(),
+            expected_columns=tuple(query.get('expected_columns', [])),
+            execution_time_ms=150 + (len(query['expected_sql']) // 10)
+        ))
+    
+    matcher = TermMatcher(
+        (form, query)
+        for query in queries
+        for form in query.terms_lower + query.words
+    )
+    rule_index = {
+        keyword: [query for query in queries if value in getattr(query, field)]
+        for keyword, field, value in _KEYWORD_RULES
+    }
+    always = [query for query in queries if any(not term.strip() for term in query.terms_lower)]
+    
+    return _GoldenIndex(queries=queries, matcher=matcher, rule_index=rule_index, always=always)
+
+
+def _score_golden_query(query: _GoldenQuery, question_lower: str) -> int:
+    """Score one golden query against a lowercase question."""
+    # Direct business term matches
+    score = 2 * sum(1 for term in query.terms_lower if term in question_lower)
+    
+    # Natural language similarity
+    if any(word in question_lower for word in query.words):
+        score += 1
+    
+    # Keyword rules
+    for keyword, field, value in _KEYWORD_RULES:
+        if keyword in question_lower and value in getattr(query, field):
+            score += 3
+            break
+    
+    return score
+
+
+def _best_golden(index: _GoldenIndex, question_lower: str) -> Optional[_GoldenQuery]:
+    """Find the highest scoring golden query; earlier queries win ties.
     
-    question_lower = question.lower()
+    Only queries the indexes report as able to score are scored; every
+    other query scores zero.
+    """
+    candidates = set(index.matcher.find(question_lower))
+    candidates.update(index.always)
+    for keyword, _, _ in _KEYWORD_RULES:
+        if keyword in question_lower:
+            candidates.update(index.rule_index[keyword])
     
-    # Load golden queries from YAML file
+    best_match = None
+    best_score = 0
+    for query in sorted(candidates, key=lambda query: query.position):
+        score = _score_golden_query(query, question_lower)
+        if score > best_score:
+            best_score = score
+            best_match = query
+    return best_match
+
+
+def _get_demo_sql(question_lower: str):
+    """Get demo SQL for common questions when OpenAI API is not configured.
+    
+    Expects the question already lowercased by the caller.
+    """
+    # Match against golden queries loaded once from YAML
     try:
-        golden_queries_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "golden_queries.yaml")
-        with open(golden_queries_path, 'r', encoding='utf-8') as f:
-            golden_data = yaml.safe_load(f)
-        
-        queries = golden_data.get('queries', [])
-        
-        # Find best matching query based on keywords
-        best_match = None
-        best_score = 0
-        
-        for query in queries:
-            score = 0
-            natural_lang = query.get('natural_language', '').lower()
-            business_terms = query.get('business_terms', [])
-            
-            # Check for direct keyword matches
-            for term in business_terms:
-                if term.lower() in question_lower:
-                    score += 2
-            
-            # Check for natural language similarity
-            if any(word in question_lower for word in natural_lang.split()):
-                score += 1
-            
-            # Check for specific patterns
-            if "прибыль" in question_lower and "gross_profit" in business_terms:
-                score += 3
-            elif "выручка" in question_lower and "revenue" in business_terms:
-                score += 3
-            elif "товар" in question_lower and "product" in natural_lang:
-                score += 3
-            elif "магазин" in question_lower and "store" in business_terms:
-                score += 3
-            elif "регион" in question_lower and "region" in business_terms:
-                score += 3
-            elif "клиент" in question_lower and "customer" in business_terms:
-                score += 3
-            elif "конверсия" in question_lower and "conversion" in business_terms:
-                score += 3
-            
-            if score > best_score:
-                best_score = score
-                best_match = query
-        
-        if best_match and best_score > 0:
+        best_match = _best_golden(_load_golden(), question_lower)
+        if best_match is not None:
             return QueryResult(
                 data=[],  # Empty data for demo
-                sql_query=best_match['expected_sql'].strip(),
-                execution_time_ms=150 + (len(best_match['expected_sql']) // 10),
-                row_count=len(best_match.get('expected_columns', [])),
-                columns=best_match.get('expected_columns', []),
+                sql_query=best_match.expected_sql,
+                execution_time_ms=best_match.execution_time_ms,
+                row_count=len(best_match.expected_columns),
+                columns=list(best_match.expected_columns),
                 confidence_score=0.9
             )
     
@@ -386,16 +574,13 @@ ORDER BY date;
     )
 
 
-def _generate_demo_explanation(question: str, sql: str) -> QueryExplanation:
-    """Generate demo explanation for the query."""
-    import re
-    
+def _generate_demo_explanation(question_lower: str, sql: str) -> QueryExplanation:
+    """Generate demo explanation for the query from the lowercased question."""
     # Extract tables from SQL
-    table_pattern = r'\bFROM\s+(\w+)|JOIN\s+(\w+)'
-    tables_used = list(set([match[0] or match[1] for match in re.findall(table_pattern, sql, re.IGNORECASE)]))
+    tables_used = list(set([match[0] or match[1] for match in _TABLE_RE.findall(sql)]))
     
     # Extract filters
-    where_match = re.search(r'WHERE\s+(.*?)(?:\s+GROUP\s+BY|\s+ORDER\s+BY|\s+LIMIT|$)', sql, re.IGNORECASE | re.DOTALL)
+    where_match = _WHERE_RE.search(sql)
     filters_applied = [where_match.group(1).strip()] if where_match else []
     
     # Generate assumptions based on SQL content
@@ -421,22 +606,8 @@ def _generate_demo_explanation(question: str, sql: str) -> QueryExplanation:
         formulas.append("Использована защита от деления на ноль")
     
     # Extract business terms from question
-    business_terms = []
-    question_lower = question.lower()
-    if "прибыль" in question_lower:
-        business_terms.append("gross_profit")
-    if "выручка" in question_lower:
-        business_terms.append("revenue")
-    if "товар" in question_lower:
-        business_terms.append("product")
-    if "магазин" in question_lower:
-        business_terms.append("store")
-    if "регион" in question_lower:
-        business_terms.append("region")
-    if "клиент" in question_lower:
-        business_terms.append("customer")
-    if "конверсия" in question_lower:
-        business_terms.append("conversion_rate")
+    found = _DEMO_TERM_MATCHER.find(question_lower)
+    business_terms = [term for term in _DEMO_BUSINESS_TERMS.values() if term in found]
     
     return QueryExplanation(
         tables_used=tables_used,
@@ -1,9 +1,9 @@
 """Logging configuration for BI-GPT."""
 
 import logging
+import weakref
 from typing import Any, Dict
 import json
-from datetime import datetime
 
 # Optional structlog import for demo mode
 try:
@@ -13,8 +13,24 @@ except ImportError:
     STRUCTLOG_AVAILABLE = False
     structlog = None
 
+# Optional orjson import; structlog falls back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 from ..config import settings
 
+# Numeric log level, resolved once from settings
+LOG_LEVEL = getattr(logging, settings.log_level.upper(), logging.INFO)
+
+
+def _orjson_dumps(event_dict: Dict[str, Any], default: Any = None, **kwargs: Any) -> str:
+    """Serialize a structlog event dict with orjson."""
+    return orjson.dumps(event_dict, default=default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
 
 def setup_logging() -> None:
     """Setup structured logging for the application."""
@@ -31,7 +47,7 @@ def setup_logging() -> None:
                 structlog.processors.StackInfoRenderer(),
                 structlog.processors.format_exc_info,
                 structlog.processors.UnicodeDecoder(),
-                structlog.processors.JSONRenderer()
+                structlog.processors.JSONRenderer(serializer=_orjson_dumps if ORJSON_AVAILABLE else json.dumps)
             ],
             context_class=dict,
             logger_factory=structlog.stdlib.LoggerFactory(),
@@ -41,107 +57,187 @@ def setup_logging() -> None:
     
     # Configure standard logging
     logging.basicConfig(
-        level=getattr(logging, settings.log_level.upper()),
+        level=LOG_LEVEL,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         handlers=[
             logging.StreamHandler(),
         ]
     )
+    
+    # Levels changed; re-resolve the cached enabled flags
+    for backend_logger in list(_BackendLogger._instances):
+        backend_logger.refresh_level()
 
 
-class QueryLogger:
-    """Structured logger for query operations."""
+class _BackendLogger:
+    """Base for loggers whose log_* methods are specialized per backend.
     
-    def __init__(self):
+    Each public ``log_x`` is bound once at construction to either
+    ``_log_x_structlog`` or ``_log_x_stdlib``, so calls do not re-check which
+    backend is installed.
+    
+    Structlog methods skip events below the level of the stdlib logger of the
+    same name. Enabled flags are cached; ``setup_logging`` refreshes them, and
+    ``refresh_level`` must be called after changing levels elsewhere.
+    """
+    
+    _methods: tuple = ()
+    _instances: "weakref.WeakSet[_BackendLogger]" = weakref.WeakSet()
+    
+    def __init__(self, name: str):
         if STRUCTLOG_AVAILABLE:
-            self.logger = structlog.get_logger("query")
+            self.logger = structlog.get_logger(name)
+            suffix = "structlog"
         else:
-            self.logger = logging.getLogger("query")
+            self.logger = logging.getLogger(name)
+            suffix = "stdlib"
+        for method in self._methods:
+            setattr(self, method, getattr(self, f"_{method}_{suffix}"))
+        
+        self._level_logger = logging.getLogger(name)
+        self.refresh_level()
+        _BackendLogger._instances.add(self)
+    
+    def refresh_level(self) -> None:
+        """Cache which levels the logger currently emits."""
+        self._info_enabled = self._level_logger.isEnabledFor(logging.INFO)
+        self._warning_enabled = self._level_logger.isEnabledFor(logging.WARNING)
+        self._error_enabled = self._level_logger.isEnabledFor(logging.ERROR)
+
+
+class QueryLogger(_BackendLogger):
+    """Structured logger for query operations."""
     
-    def log_query_start(self, request_id: str, user_id: str, question: str) -> None:
+    _methods = (
+        "log_query_start",
+        "log_sql_generated",
+        "log_security_check",
+        "log_query_execution",
+        "log_query_error",
+        "log_pii_incident",
+        "log_security_violation",
+    )
+    
+    def __init__(self):
+        super().__init__("query")
+    
+    def _log_query_start_structlog(self, request_id: str, user_id: str, question: str) -> None:
         """Log query start."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info(
-                "query_started",
-                request_id=request_id,
-                user_id=user_id,
-                question=question[:200] + "..." if len(question) > 200 else question
-            )
-        else:
-            self.logger.info(f"Query started: {request_id} by {user_id}: {question[:100]}...")
+        if not self._info_enabled:
+            return
+        self.logger.info(
+            "query_started",
+            request_id=request_id,
+            user_id=user_id,
+            question=question[:200] + "..." if len(question) > 200 else question
+        )
+    
+    def _log_query_start_stdlib(self, request_id: str, user_id: str, question: str) -> None:
+        """Log query start."""
+        self.logger.info("Query started: %s by %s: %.100s...", request_id, user_id, question)
     
-    def log_sql_generated(self, request_id: str, sql: str, confidence: float) -> None:
+    def _log_sql_generated_structlog(self, request_id: str, sql: str, confidence: float) -> None:
         """Log SQL generation."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info("sql_generated", request_id=request_id, sql=sql, confidence=confidence)
-        else:
-            self.logger.info(f"SQL generated: {request_id} (confidence: {confidence:.2f})")
+        if not self._info_enabled:
+            return
+        self.logger.info("sql_generated", request_id=request_id, sql=sql, confidence=confidence)
+    
+    def _log_sql_generated_stdlib(self, request_id: str, sql: str, confidence: float) -> None:
+        """Log SQL generation."""
+        self.logger.info("SQL generated: %s (confidence: %.2f)", request_id, confidence)
     
-    def log_security_check(self, request_id: str, security_level: str, is_safe: bool, warnings: list) -> None:
+    def _log_security_check_structlog(self, request_id: str, security_level: str, is_safe: bool, warnings: list) -> None:
         """Log security check results."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info("security_check", request_id=request_id, security_level=security_level, is_safe=is_safe, warnings=warnings)
-        else:
-            self.logger.info(f"Security check: {request_id} - {security_level} - Safe: {is_safe}")
+        if not self._info_enabled:
+            return
+        self.logger.info("security_check", request_id=request_id, security_level=security_level, is_safe=is_safe, warnings=warnings)
+    
+    def _log_security_check_stdlib(self, request_id: str, security_level: str, is_safe: bool, warnings: list) -> None:
+        """Log security check results."""
+        self.logger.info("Security check: %s - %s - Safe: %s", request_id, security_level, is_safe)
     
-    def log_query_execution(self, request_id: str, execution_time_ms: float, row_count: int, success: bool) -> None:
+    def _log_query_execution_structlog(self, request_id: str, execution_time_ms: float, row_count: int, success: bool) -> None:
         """Log query execution."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info("query_executed", request_id=request_id, execution_time_ms=execution_time_ms, row_count=row_count, success=success)
-        else:
-            self.logger.info(f"Query executed: {request_id} - {execution_time_ms}ms - {row_count} rows - Success: {success}")
+        if not self._info_enabled:
+            return
+        self.logger.info("query_executed", request_id=request_id, execution_time_ms=execution_time_ms, row_count=row_count, success=success)
+    
+    def _log_query_execution_stdlib(self, request_id: str, execution_time_ms: float, row_count: int, success: bool) -> None:
+        """Log query execution."""
+        self.logger.info("Query executed: %s - %sms - %s rows - Success: %s", request_id, execution_time_ms, row_count, success)
     
-    def log_query_error(self, request_id: str, error: str, error_type: str = "execution") -> None:
+    def _log_query_error_structlog(self, request_id: str, error: str, error_type: str = "execution") -> None:
         """Log query error."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.error("query_error", request_id=request_id, error=error, error_type=error_type)
-        else:
-            self.logger.error(f"Query error: {request_id} - {error_type}: {error}")
+        if not self._error_enabled:
+            return
+        self.logger.error("query_error", request_id=request_id, error=error, error_type=error_type)
+    
+    def _log_query_error_stdlib(self, request_id: str, error: str, error_type: str = "execution") -> None:
+        """Log query error."""
+        self.logger.error("Query error: %s - %s: %s", request_id, error_type, error)
     
-    def log_pii_incident(self, request_id: str, user_id: str, pii_columns: list) -> None:
+    def _log_pii_incident_structlog(self, request_id: str, user_id: str, pii_columns: list) -> None:
         """Log PII incident."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.warning("pii_incident", request_id=request_id, user_id=user_id, pii_columns=pii_columns)
-        else:
-            self.logger.warning(f"PII incident: {request_id} by {user_id} - columns: {pii_columns}")
+        if not self._warning_enabled:
+            return
+        self.logger.warning("pii_incident", request_id=request_id, user_id=user_id, pii_columns=pii_columns)
+    
+    def _log_pii_incident_stdlib(self, request_id: str, user_id: str, pii_columns: list) -> None:
+        """Log PII incident."""
+        self.logger.warning("PII incident: %s by %s - columns: %s", request_id, user_id, pii_columns)
     
-    def log_security_violation(self, request_id: str, user_id: str, violation_type: str, details: str) -> None:
+    def _log_security_violation_structlog(self, request_id: str, user_id: str, violation_type: str, details: str) -> None:
         """Log security violation."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.warning("security_violation", request_id=request_id, user_id=user_id, violation_type=violation_type, details=details)
-        else:
-            self.logger.warning(f"Security violation: {request_id} by {user_id} - {violation_type}: {details}")
+        if not self._warning_enabled:
+            return
+        self.logger.warning("security_violation", request_id=request_id, user_id=user_id, violation_type=violation_type, details=details)
+    
+    def _log_security_violation_stdlib(self, request_id: str, user_id: str, violation_type: str, details: str) -> None:
+        """Log security violation."""
+        self.logger.warning("Security violation: %s by %s - %s: %s", request_id, user_id, violation_type, details)
 
 
-class AuditLogger:
+class AuditLogger(_BackendLogger):
     """Audit logger for compliance and security."""
     
+    _methods = (
+        "log_user_action",
+        "log_data_access",
+        "log_configuration_change",
+    )
+    
     def __init__(self):
-        if STRUCTLOG_AVAILABLE:
-            self.logger = structlog.get_logger("audit")
-        else:
-            self.logger = logging.getLogger("audit")
+        super().__init__("audit")
     
-    def log_user_action(self, user_id: str, action: str, resource: str, details: Dict[str, Any]) -> None:
+    def _log_user_action_structlog(self, user_id: str, action: str, resource: str, details: Dict[str, Any]) -> None:
         """Log user action for audit trail."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info("user_action", user_id=user_id, action=action, resource=resource, details=details, timestamp=datetime.utcnow().isoformat())
-        else:
-            self.logger.info(f"User action: {user_id} - {action} on {resource}")
+        if not self._info_enabled:
+            return
+        self.logger.info("user_action", user_id=user_id, action=action, resource=resource, details=details)
+    
+    def _log_user_action_stdlib(self, user_id: str, action: str, resource: str, details: Dict[str, Any]) -> None:
+        """Log user action for audit trail."""
+        self.logger.info("User action: %s - %s on %s", user_id, action, resource)
     
-    def log_data_access(self, user_id: str, table: str, columns: list, row_count: int) -> None:
+    def _log_data_access_structlog(self, user_id: str, table: str, columns: list, row_count: int) -> None:
         """Log data access for audit trail."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info("data_access", user_id=user_id, table=table, columns=columns, row_count=row_count, timestamp=datetime.utcnow().isoformat())
-        else:
-            self.logger.info(f"Data access: {user_id} - {table} ({len(columns)} columns, {row_count} rows)")
+        if not self._info_enabled:
+            return
+        self.logger.info("data_access", user_id=user_id, table=table, columns=columns, row_count=row_count)
+    
+    def _log_data_access_stdlib(self, user_id: str, table: str, columns: list, row_count: int) -> None:
+        """Log data access for audit trail."""
+        self.logger.info("Data access: %s - %s (%d columns, %s rows)", user_id, table, len(columns), row_count)
     
-    def log_configuration_change(self, user_id: str, change_type: str, old_value: Any, new_value: Any) -> None:
+    def _log_configuration_change_structlog(self, user_id: str, change_type: str, old_value: Any, new_value: Any) -> None:
         """Log configuration changes."""
-        if STRUCTLOG_AVAILABLE:
-            self.logger.info("configuration_change", user_id=user_id, change_type=change_type, old_value=old_value, new_value=new_value, timestamp=datetime.utcnow().isoformat())
-        else:
-            self.logger.info(f"Config change: {user_id} - {change_type}")
+        if not self._info_enabled:
+            return
+        self.logger.info("configuration_change", user_id=user_id, change_type=change_type, old_value=old_value, new_value=new_value)
+    
+    def _log_configuration_change_stdlib(self, user_id: str, change_type: str, old_value: Any, new_value: Any) -> None:
+        """Log configuration changes."""
+        self.logger.info("Config change: %s - %s", user_id, change_type)
 
 
 # Global logger instances
@@ -1,16 +1,66 @@
 """Metrics collection for BI-GPT."""
 
+import asyncio
+import threading
+from array import array
 import time
-from typing import Dict, Any, Optional, List
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import wraps
+from itertools import islice
 import logging
 from collections import defaultdict, deque
 
+# Optional prometheus_client import for demo mode
+try:
+    import prometheus_client
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    prometheus_client = None
+
 logger = logging.getLogger(__name__)
 
+# Prometheus instruments, updated where queries are processed
+if PROMETHEUS_AVAILABLE:
+    QUERY_COUNTER = prometheus_client.Counter(
+        "bigpt_queries_total",
+        "Processed queries",
+        labelnames=["status", "role"]
+    )
+    QUERY_LATENCY = prometheus_client.Histogram(
+        "bigpt_query_latency_ms",
+        "Query execution time in milliseconds",
+        buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+    )
+    PII_INCIDENTS = prometheus_client.Counter(
+        "bigpt_pii_incidents_total",
+        "Queries touching PII columns"
+    )
+
+
+def observe_query(status: str, role: str, execution_time_ms: Optional[float] = None, pii_detected: bool = False) -> None:
+    """Update Prometheus instruments for a processed query."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    
+    QUERY_COUNTER.labels(status=status, role=role).inc()
+    if execution_time_ms is not None:
+        QUERY_LATENCY.observe(execution_time_ms)
+    if pii_detected:
+        PII_INCIDENTS.inc()
+
+
+def render_prometheus() -> Tuple[bytes, str]:
+    """Render Prometheus text exposition and its content type."""
+    if not PROMETHEUS_AVAILABLE:
+        return b"", "text/plain; charset=utf-8"
+    return prometheus_client.generate_latest(), prometheus_client.CONTENT_TYPE_LATEST
 
-@dataclass
+
+@dataclass(slots=True)
 class QueryMetrics:
     """Metrics for a single query."""
     request_id: str
@@ -24,76 +74,161 @@ class QueryMetrics:
     security_level: str
     pii_detected: bool
     error_message: Optional[str] = None
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: float = field(default_factory=time.time)  # seconds since epoch
+    success: bool = field(init=False)
+    
+    def __post_init__(self):
+        self.success = self.sql_executed and not self.error_message
+
+
+SLOW_QUERY_MS = 5000.0
+
+SECONDS_PER_HOUR = 3600
+
+
+@dataclass(slots=True)
+class _HourBucket:
+    """Counters for one hour of queries."""
+    hour: int = -1  # hours since epoch this slot currently holds
+    queries_count: int = 0
+    success_count: int = 0
+    sum_execution_time: float = 0.0
+    pii_incidents: int = 0
+
+
+def _synchronized(method):
+    """Run a MetricsCollector method under the collector lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class MetricsCollector:
     """Collects and aggregates metrics for BI-GPT."""
     
-    def __init__(self, max_history: int = 1000):
+    def __init__(self, max_history: int = 1000, max_hours: int = 168):
         """Initialize metrics collector."""
         self.max_history = max_history
+        self.max_hours = max_hours
         self.query_history: deque = deque(maxlen=max_history)
+        # History-wide totals, adjusted as queries enter and leave query_history
+        self._totals: Dict[str, float] = dict.fromkeys([
+            "total_queries",
+            "successful_queries",
+            "pii_incidents",
+            "security_violations",
+            "blocked_queries",
+            "total_execution_time",
+            "total_confidence",
+            "executed_queries",
+            "executed_time"
+        ], 0)
+        # Sorted latencies of executed queries, packed as C doubles
+        self._execution_times = array("d")
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        # Running sums only; averages and rates are derived in the getters
         self.user_metrics: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
             "total_queries": 0,
-            "successful_queries": 0,
-            "failed_queries": 0,
+            "success_count": 0,
             "pii_incidents": 0,
-            "total_execution_time": 0.0,
-            "avg_confidence": 0.0
-        })
-        self.hourly_stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-            "queries_count": 0,
-            "success_rate": 0.0,
-            "avg_execution_time": 0.0,
-            "pii_incidents": 0
+            "sum_execution_time": 0.0,
+            "sum_confidence": 0.0
         })
+        # Ring of hourly buckets, slot = hours since epoch % max_hours
+        self._hour_ring: List[_HourBucket] = [_HourBucket() for _ in range(max_hours)]
     
+    def submit(self, metrics: QueryMetrics) -> None:
+        """Hand metrics to the background worker, or record inline if none runs."""
+        if self._queue is not None:
+            self._queue.put_nowait(metrics)
+        else:
+            self.record_query(metrics)
+    
+    async def run_worker(self) -> None:
+        """Drain submitted metrics until cancelled."""
+        self._queue = asyncio.Queue()
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                self.record_queries(batch)
+        finally:
+            queue, self._queue = self._queue, None
+            batch = []
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            self.record_queries(batch)
+    
+    @_synchronized
     def record_query(self, metrics: QueryMetrics) -> None:
         """Record query metrics."""
+        self._record(metrics)
+    
+    @_synchronized
+    def record_queries(self, batch: List[QueryMetrics]) -> None:
+        """Record several query metrics under a single lock acquisition."""
+        for metrics in batch:
+            self._record(metrics)
+    
+    def _record(self, metrics: QueryMetrics) -> None:
+        """Apply one query to history, totals and buckets; caller holds the lock."""
+        if len(self.query_history) == self.max_history:
+            self._apply_totals(self.query_history[0], -1)
         self.query_history.append(metrics)
+        self._apply_totals(metrics, 1)
+        ok = metrics.success
         
         # Update user metrics
-        user_id = metrics.user_id
-        self.user_metrics[user_id]["total_queries"] += 1
+        um = self.user_metrics[metrics.user_id]
+        um["total_queries"] += 1
+        um["success_count"] += ok
+        um["pii_incidents"] += metrics.pii_detected
+        um["sum_execution_time"] += metrics.execution_time_ms
+        um["sum_confidence"] += metrics.confidence_score
         
-        if metrics.sql_executed and not metrics.error_message:
-            self.user_metrics[user_id]["successful_queries"] += 1
-        else:
-            self.user_metrics[user_id]["failed_queries"] += 1
-        
-        if metrics.pii_detected:
-            self.user_metrics[user_id]["pii_incidents"] += 1
-        
-        self.user_metrics[user_id]["total_execution_time"] += metrics.execution_time_ms
-        
-        # Update average confidence
-        current_avg = self.user_metrics[user_id]["avg_confidence"]
-        total_queries = self.user_metrics[user_id]["total_queries"]
-        self.user_metrics[user_id]["avg_confidence"] = (
-            (current_avg * (total_queries - 1) + metrics.confidence_score) / total_queries
-        )
-        
-        # Update hourly stats
-        hour_key = metrics.timestamp.strftime("%Y-%m-%d-%H")
-        self.hourly_stats[hour_key]["queries_count"] += 1
-        
-        if metrics.sql_executed and not metrics.error_message:
-            self.hourly_stats[hour_key]["success_rate"] = (
-                self.hourly_stats[hour_key]["success_rate"] * 
-                (self.hourly_stats[hour_key]["queries_count"] - 1) + 1.0
-            ) / self.hourly_stats[hour_key]["queries_count"]
-        
-        if metrics.pii_detected:
-            self.hourly_stats[hour_key]["pii_incidents"] += 1
+        # Update hourly stats, recycling the slot if it holds an older hour
+        hour = int(metrics.timestamp) // SECONDS_PER_HOUR
+        slot = self._hour_ring[hour % self.max_hours]
+        if slot.hour != hour:
+            slot = self._hour_ring[hour % self.max_hours] = _HourBucket(hour)
+        slot.queries_count += 1
+        slot.success_count += ok
+        slot.pii_incidents += metrics.pii_detected
+        slot.sum_execution_time += metrics.execution_time_ms
+    
+    def _apply_totals(self, q: QueryMetrics, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a query from the history totals."""
+        totals = self._totals
+        totals["total_queries"] += sign
+        totals["successful_queries"] += sign * q.success
+        totals["pii_incidents"] += sign * q.pii_detected
+        totals["total_execution_time"] += sign * q.execution_time_ms
+        totals["total_confidence"] += sign * q.confidence_score
+        if q.security_level in ("dangerous", "blocked"):
+            totals["security_violations"] += sign
+            if q.security_level == "blocked":
+                totals["blocked_queries"] += sign
         
-        # Update average execution time
-        current_avg_time = self.hourly_stats[hour_key]["avg_execution_time"]
-        queries_count = self.hourly_stats[hour_key]["queries_count"]
-        self.hourly_stats[hour_key]["avg_execution_time"] = (
-            (current_avg_time * (queries_count - 1) + metrics.execution_time_ms) / queries_count
-        )
+        if q.sql_executed:
+            totals["executed_queries"] += sign
+            totals["executed_time"] += sign * q.execution_time_ms
+            if sign > 0:
+                insort(self._execution_times, q.execution_time_ms)
+            else:
+                del self._execution_times[bisect_left(self._execution_times, q.execution_time_ms)]
+    
+    def _percentile(self, fraction: float) -> float:
+        """Read a percentile from the sorted latency window."""
+        times = self._execution_times
+        if not times:
+            return 0.0
+        return times[min(int(fraction * len(times)), len(times) - 1)]
     
+    @_synchronized
     def get_overall_metrics(self) -> Dict[str, Any]:
         """Get overall system metrics."""
         if not self.query_history:
@@ -106,55 +241,66 @@ class MetricsCollector:
                 "active_users": 0
             }
         
-        total_queries = len(self.query_history)
-        successful_queries = sum(1 for q in self.query_history if q.sql_executed and not q.error_message)
-        pii_incidents = sum(1 for q in self.query_history if q.pii_detected)
-        total_execution_time = sum(q.execution_time_ms for q in self.query_history)
-        total_confidence = sum(q.confidence_score for q in self.query_history)
-        active_users = len(self.user_metrics)
+        totals = self._totals
+        total_queries = totals["total_queries"]
         
         return {
             "total_queries": total_queries,
-            "success_rate": successful_queries / total_queries if total_queries > 0 else 0.0,
-            "avg_execution_time": total_execution_time / total_queries if total_queries > 0 else 0.0,
-            "avg_confidence": total_confidence / total_queries if total_queries > 0 else 0.0,
-            "pii_incidents": pii_incidents,
-            "active_users": active_users
+            "success_rate": totals["successful_queries"] / total_queries,
+            "avg_execution_time": totals["total_execution_time"] / total_queries,
+            "avg_confidence": totals["total_confidence"] / total_queries,
+            "pii_incidents": totals["pii_incidents"],
+            "active_users": len(self.user_metrics)
         }
     
+    @_synchronized
     def get_user_metrics(self, user_id: str) -> Dict[str, Any]:
         """Get metrics for specific user."""
-        return self.user_metrics.get(user_id, {
-            "total_queries": 0,
-            "successful_queries": 0,
-            "failed_queries": 0,
-            "pii_incidents": 0,
-            "total_execution_time": 0.0,
-            "avg_confidence": 0.0
-        })
+        um = self.user_metrics.get(user_id)
+        if not um:
+            return {
+                "total_queries": 0,
+                "successful_queries": 0,
+                "failed_queries": 0,
+                "pii_incidents": 0,
+                "total_execution_time": 0.0,
+                "avg_confidence": 0.0
+            }
+        
+        total_queries = um["total_queries"]
+        return {
+            "total_queries": total_queries,
+            "successful_queries": um["success_count"],
+            "failed_queries": total_queries - um["success_count"],
+            "pii_incidents": um["pii_incidents"],
+            "total_execution_time": um["sum_execution_time"],
+            "avg_confidence": um["sum_confidence"] / total_queries
+        }
     
+    @_synchronized
     def get_hourly_stats(self, hours: int = 24) -> List[Dict[str, Any]]:
         """Get hourly statistics for last N hours."""
-        now = datetime.utcnow()
+        current = int(time.time()) // SECONDS_PER_HOUR
         stats = []
         
-        for i in range(hours):
-            hour = now - timedelta(hours=i)
-            hour_key = hour.strftime("%Y-%m-%d-%H")
+        for hour in range(current - hours + 1, current + 1):
+            slot = self._hour_ring[hour % self.max_hours]
+            count = slot.queries_count if slot.hour == hour else 0
             
             stats.append({
-                "hour": hour_key,
-                "queries_count": self.hourly_stats[hour_key]["queries_count"],
-                "success_rate": self.hourly_stats[hour_key]["success_rate"],
-                "avg_execution_time": self.hourly_stats[hour_key]["avg_execution_time"],
-                "pii_incidents": self.hourly_stats[hour_key]["pii_incidents"]
+                "hour": datetime.utcfromtimestamp(hour * SECONDS_PER_HOUR).strftime("%Y-%m-%d-%H"),
+                "queries_count": count,
+                "success_rate": slot.success_count / count if count else 0.0,
+                "avg_execution_time": slot.sum_execution_time / count if count else 0.0,
+                "pii_incidents": slot.pii_incidents if count else 0
             })
         
-        return list(reversed(stats))
+        return stats
     
+    @_synchronized
     def get_recent_queries(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent queries."""
-        recent = list(self.query_history)[-limit:]
+        recent = list(islice(reversed(self.query_history), limit))[::-1]
         return [
             {
                 "request_id": q.request_id,
@@ -162,12 +308,13 @@ class MetricsCollector:
                 "question": q.question[:100] + "..." if len(q.question) > 100 else q.question,
                 "execution_time_ms": q.execution_time_ms,
                 "confidence_score": q.confidence_score,
-                "success": q.sql_executed and not q.error_message,
-                "timestamp": q.timestamp.isoformat()
+                "success": q.success,
+                "timestamp": datetime.utcfromtimestamp(q.timestamp).isoformat()
             }
             for q in recent
         ]
     
+    @_synchronized
     def get_security_metrics(self) -> Dict[str, Any]:
         """Get security-related metrics."""
         if not self.query_history:
@@ -178,10 +325,11 @@ class MetricsCollector:
                 "blocked_queries": 0
             }
         
-        total_queries = len(self.query_history)
-        pii_incidents = sum(1 for q in self.query_history if q.pii_detected)
-        security_violations = sum(1 for q in self.query_history if q.security_level in ["dangerous", "blocked"])
-        blocked_queries = sum(1 for q in self.query_history if q.security_level == "blocked")
+        totals = self._totals
+        total_queries = totals["total_queries"]
+        pii_incidents = totals["pii_incidents"]
+        security_violations = totals["security_violations"]
+        blocked_queries = totals["blocked_queries"]
         
         return {
             "total_queries": total_queries,
@@ -192,6 +340,7 @@ class MetricsCollector:
             "security_violation_rate": security_violations / total_queries if total_queries > 0 else 0.0
         }
     
+    @_synchronized
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get performance metrics."""
         if not self.query_history:
@@ -202,7 +351,7 @@ class MetricsCollector:
                 "slow_queries_count": 0
             }
         
-        execution_times = [q.execution_time_ms for q in self.query_history if q.sql_executed]
+        execution_times = self._execution_times
         
         if not execution_times:
             return {
@@ -212,14 +361,13 @@ class MetricsCollector:
                 "slow_queries_count": 0
             }
         
-        execution_times.sort()
         n = len(execution_times)
         
         return {
-            "avg_execution_time": sum(execution_times) / n,
-            "p95_execution_time": execution_times[int(0.95 * n)] if n > 0 else 0.0,
-            "p99_execution_time": execution_times[int(0.99 * n)] if n > 0 else 0.0,
-            "slow_queries_count": sum(1 for t in execution_times if t > 5000)  # > 5 seconds
+            "avg_execution_time": self._totals["executed_time"] / n,
+            "p95_execution_time": self._percentile(0.95),
+            "p99_execution_time": self._percentile(0.99),
+            "slow_queries_count": n - bisect_right(execution_times, SLOW_QUERY_MS)
         }
 
 
@@ -0,0 +1,38 @@
+"""JSON response helpers for BI-GPT."""
+
+import json
+from typing import Any
+
+# Optional orjson import; falls back to stdlib json
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    from fastapi.responses import JSONResponse as FastJSONResponse
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def dumps_json(content: Any) -> bytes:
+    """Serialize content to UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def dumps_json_indented(content: Any) -> str:
+    """Serialize content to a two-space indented JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(content, indent=2, ensure_ascii=False)
+
+
+def loads_json(data: Any) -> Any:
+    """Parse JSON text or bytes.
+    
+    Raises json.JSONDecodeError on invalid input with either backend.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
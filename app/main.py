@@ -7,27 +7,47 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import contextlib
 import logging
 import uvicorn
 
 from .api import query_router, health_router, metrics_router
 from .config import settings
+from .core.responses import FastJSONResponse
+from .core.metrics import metrics_collector
+from .core.logging import LOG_LEVEL, setup_logging
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, settings.log_level.upper()),
+    level=LOG_LEVEL,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
 logger = logging.getLogger(__name__)
 
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configure logging and run the metrics worker for the lifetime of the app."""
+    # structlog's TimeStamper stamps audit events only once configured
+    setup_logging()
+    worker = asyncio.create_task(metrics_collector.run_worker())
+    yield
+    worker.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await worker
+
+
 # Create FastAPI app
 app = FastAPI(
     title="BI-GPT API",
     description="Business Intelligence Agent for Natural Language to SQL",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -91,5 +111,5 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level=settings.log_level.lower()
+        log_level=logging.getLevelName(LOG_LEVEL).lower()
     )
\ No newline at end of file
@@ -1,10 +1,17 @@
 """Business glossary models."""
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 from enum import Enum
 
 
+@lru_cache(maxsize=2048)
+def _normalize(text: str) -> str:
+    """Normalize a term or synonym for lookup."""
+    return text.lower().strip()
+
+
 class TermCategory(str, Enum):
     """Categories for business terms."""
     FINANCIAL = "financial"
@@ -26,6 +33,12 @@ class BusinessTerm(BaseModel):
     owner: str = Field(..., description="Owner of the term")
     category: TermCategory = Field(..., description="Category of the term")
     is_pii: bool = Field(default=False, description="Whether this term contains PII")
+    
+    @field_validator("synonyms")
+    @classmethod
+    def _normalize_synonyms(cls, synonyms: List[str]) -> List[str]:
+        """Store synonyms lowercased so lookups need no per-call folding."""
+        return [_normalize(s) for s in synonyms]
 
 
 class ColumnDefinition(BaseModel):
@@ -49,23 +62,62 @@ class Glossary(BaseModel):
     terms: Dict[str, BusinessTerm] = Field(..., description="Business terms")
     table_mappings: Dict[str, TableMapping] = Field(..., description="Table mappings")
     
+    _synonym_index: Dict[str, BusinessTerm] = PrivateAttr(default_factory=dict)
+    # Term keys and synonyms; keys take precedence over synonyms
+    _term_index: Dict[str, BusinessTerm] = PrivateAttr(default_factory=dict)
+    _pii_columns: List[str] = PrivateAttr(default_factory=list)
+    _pii_column_set: FrozenSet[str] = PrivateAttr(default_factory=frozenset)
+    
+    @model_validator(mode="after")
+    def _build_indexes(self) -> "Glossary":
+        """Precompute lookups that do not change after loading."""
+        for term in self.terms.values():
+            for s in term.synonyms:
+                self._synonym_index.setdefault(s, term)
+        self._term_index = {**self._synonym_index, **self.terms}
+        self._pii_columns = [
+            f"{table_name}.{column.name}"
+            for table_name, table_mapping in self.table_mappings.items()
+            for column in table_mapping.columns
+            if column.is_pii
+        ]
+        self._pii_column_set = frozenset(column.lower() for column in self._pii_columns)
+        return self
+    
     def get_term_by_synonym(self, synonym: str) -> Optional[BusinessTerm]:
         """Find term by synonym."""
-        synonym_lower = synonym.lower().strip()
-        for term in self.terms.values():
-            if synonym_lower in [s.lower() for s in term.synonyms]:
-                return term
-        return None
+        return self._synonym_index.get(_normalize(synonym))
+    
+    def find_term(self, text: str) -> Optional[BusinessTerm]:
+        """Find term by key or synonym."""
+        return self._term_index.get(_normalize(text))
     
     def get_pii_columns(self) -> List[str]:
         """Get list of all PII columns."""
-        pii_columns = []
-        for table_name, table_mapping in self.table_mappings.items():
-            for column in table_mapping.columns:
-                if column.is_pii:
-                    pii_columns.append(f"{table_name}.{column.name}")
-        return pii_columns
+        return list(self._pii_columns)
+    
+    def get_pii_column_set(self) -> FrozenSet[str]:
+        """Get lowercase PII columns as a set for membership tests."""
+        return self._pii_column_set
     
     def get_permitted_tables(self) -> List[str]:
         """Get list of permitted tables."""
-        return list(self.table_mappings.keys())
\ No newline at end of file
+        return list(self.table_mappings.keys())
+    
+    def get_table_schemas(self) -> Dict[str, Any]:
+        """Get table descriptions and columns as plain dicts for prompts."""
+        return {
+            table_name: {
+                "description": table_mapping.description,
+                "columns": [
+                    {
+                        "name": col.name,
+                        "type": col.type,
+                        "description": col.description,
+                        "is_pii": col.is_pii
+                    }
+                    for col in table_mapping.columns
+                ]
+            }
+            for table_name, table_mapping in self.table_mappings.items()
+        }
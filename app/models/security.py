@@ -1,7 +1,7 @@
 """Security models for BI-GPT."""
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -22,6 +22,8 @@ class PIIFlag(str, Enum):
 
 class SecurityCheck(BaseModel):
     """Security check result."""
+    model_config = ConfigDict(frozen=True)
+    
     level: SecurityLevel = Field(..., description="Security level")
     pii_flag: PIIFlag = Field(default=PIIFlag.NONE, description="PII detection flag")
     blocked_operations: List[str] = Field(default_factory=list, description="Blocked SQL operations")
@@ -39,7 +41,7 @@ class AuditLog(BaseModel):
     """Audit log entry."""
     request_id: str = Field(..., description="Request identifier")
     user_id: str = Field(..., description="User identifier")
-    timestamp: str = Field(..., description="Timestamp")
+    timestamp: int = Field(..., description="Timestamp in nanoseconds since epoch")
     original_question: str = Field(..., description="Original natural language question")
     generated_sql: str = Field(..., description="Generated SQL query")
     security_check: SecurityCheck = Field(..., description="Security check result")
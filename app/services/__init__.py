@@ -4,10 +4,12 @@ from .glossary_service import GlossaryService
 from .sql_generator import SQLGenerator
 from .security_service import SecurityService
 from .query_executor import QueryExecutor
+from .query_cache import QueryCache
 
 __all__ = [
     "GlossaryService",
     "SQLGenerator", 
     "SecurityService",
-    "QueryExecutor"
+    "QueryExecutor",
+    "QueryCache"
 ]
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""Process-wide service instances shared by the API modules."""
+
+from functools import lru_cache
+
+from .glossary_service import GlossaryService
+from .sql_generator import SQLGenerator
+from .security_service import SecurityService
+from .query_executor import QueryExecutor
+from .query_cache import QueryCache
+
+
+@lru_cache(maxsize=1)
+def get_glossary_service() -> GlossaryService:
+    """Get shared glossary service."""
+    return GlossaryService()
+
+
+@lru_cache(maxsize=1)
+def get_query_executor() -> QueryExecutor:
+    """Get shared query executor."""
+    return QueryExecutor()
+
+
+@lru_cache(maxsize=1)
+def get_sql_generator() -> SQLGenerator:
+    """Get shared SQL generator."""
+    return SQLGenerator(get_glossary_service().get_glossary())
+
+
+@lru_cache(maxsize=1)
+def get_security_service() -> SecurityService:
+    """Get shared security service."""
+    return SecurityService(get_glossary_service().get_glossary())
+
+
+@lru_cache(maxsize=1)
+def get_query_cache() -> QueryCache:
+    """Get shared query cache."""
+    return QueryCache()
@@ -1,15 +1,42 @@
 """Business glossary service."""
 
+import os
+import threading
 import yaml
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple
 from pathlib import Path
 import logging
 
 from ..models.glossary import Glossary, BusinessTerm, TableMapping
 from ..config import settings
+from .term_matcher import TermMatcher, glossary_term_matcher
 
 logger = logging.getLogger(__name__)
 
+# libyaml-backed loader when available
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Separator for joined lowercase synonym strings; never occurs in questions
+_JOIN_SEP = "\x1f"
+
+
+class _LoadedGlossary(NamedTuple):
+    """Parsed glossary with lookups derived from it."""
+    glossary: Glossary
+    counts: Dict[str, int]
+    term_matcher: TermMatcher
+    # (term, lowercase synonyms, synonyms joined by _JOIN_SEP, lowercase description)
+    related_index: List[Tuple[BusinessTerm, List[str], str, str]]
+    # LLM context parts shared by every request; must not be mutated
+    permitted_tables: List[str]
+    pii_columns: List[str]
+    table_schemas: Dict[str, Any]
+
+
+# Parsed glossaries shared across instances: path -> ((mtime_ns, size), loaded state)
+_GLOSSARY_CACHE: Dict[str, Tuple[Tuple[int, int], _LoadedGlossary]] = {}
+_GLOSSARY_CACHE_LOCK = threading.Lock()
+
 
 class GlossaryService:
     """Service for managing business glossary."""
@@ -18,19 +45,78 @@ class GlossaryService:
         """Initialize glossary service."""
         self.glossary_path = glossary_path or settings.glossary_path
         self._glossary: Optional[Glossary] = None
+        self._counts: Dict[str, int] = {}
+        self._term_matcher: Optional[TermMatcher] = None
+        self._related_index: List[Tuple[BusinessTerm, List[str], str, str]] = []
+        self._permitted_tables: List[str] = []
+        self._pii_columns: List[str] = []
+        self._table_schemas: Dict[str, Any] = {}
         self._load_glossary()
     
     def _load_glossary(self) -> None:
-        """Load glossary from YAML file."""
+        """Load glossary from YAML file, reusing it while the file is unchanged."""
         try:
-            with open(self.glossary_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                self._glossary = Glossary(**data)
-                logger.info(f"Loaded glossary version {self._glossary.version}")
+            path = os.path.abspath(self.glossary_path)
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            with _GLOSSARY_CACHE_LOCK:
+                cached = _GLOSSARY_CACHE.get(path)
+                if cached is None or cached[0] != signature:
+                    cached = (signature, self._parse_glossary(path))
+                    _GLOSSARY_CACHE[path] = cached
+            loaded = cached[1]
+            self._glossary = loaded.glossary
+            self._counts = loaded.counts
+            self._term_matcher = loaded.term_matcher
+            self._related_index = loaded.related_index
+            self._permitted_tables = loaded.permitted_tables
+            self._pii_columns = loaded.pii_columns
+            self._table_schemas = loaded.table_schemas
         except Exception as e:
             logger.error(f"Failed to load glossary: {e}")
             raise
     
+    def _parse_glossary(self, path: str) -> _LoadedGlossary:
+        """Parse glossary YAML and build its derived lookups."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=_YAML_LOADER)
+        glossary = Glossary(**data)
+        logger.info(f"Loaded glossary version {glossary.version}")
+        return _LoadedGlossary(
+            glossary,
+            self._compute_counts(glossary),
+            self._build_term_matcher(glossary),
+            [
+                (term, term.synonyms, _JOIN_SEP.join(term.synonyms), term.description.lower())
+                for term in glossary.terms.values()
+            ],
+            glossary.get_permitted_tables(),
+            glossary.get_pii_columns(),
+            glossary.get_table_schemas()
+        )
+    
+    @staticmethod
+    def _compute_counts(glossary: Glossary) -> Dict[str, int]:
+        """Compute glossary size counters."""
+        return {
+            "terms_count": len(glossary.terms),
+            "table_mappings_count": len(glossary.table_mappings),
+            "pii_columns_count": len(glossary.get_pii_columns()),
+            "permitted_tables_count": len(glossary.get_permitted_tables())
+        }
+    
+    @staticmethod
+    def _build_term_matcher(glossary: Glossary) -> TermMatcher:
+        """Build matcher over canonical names and synonyms of all terms."""
+        return glossary_term_matcher(glossary)
+    
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Get glossary size counters, recomputed only on (re)load."""
+        if self._glossary is None:
+            self._load_glossary()
+        return self._counts
+    
     def get_glossary(self) -> Glossary:
         """Get current glossary."""
         if self._glossary is None:
@@ -39,33 +125,24 @@ class GlossaryService:
     
     def find_term(self, text: str) -> Optional[BusinessTerm]:
         """Find business term by text (exact match or synonym)."""
-        glossary = self.get_glossary()
-        
-        # First try exact match with canonical names
-        text_lower = text.lower().strip()
-        if text_lower in glossary.terms:
-            return glossary.terms[text_lower]
-        
-        # Then try synonyms
-        return glossary.get_term_by_synonym(text)
+        return self.get_glossary().find_term(text)
     
     def find_related_terms(self, text: str, limit: int = 5) -> List[BusinessTerm]:
         """Find related terms based on text similarity."""
-        glossary = self.get_glossary()
+        if self._glossary is None:
+            self._load_glossary()
         related_terms = []
         
         text_lower = text.lower().strip()
         
-        for term in glossary.terms.values():
-            # Check if text appears in any synonym
-            for synonym in term.synonyms:
-                if text_lower in synonym.lower() or synonym.lower() in text_lower:
-                    related_terms.append(term)
-                    break
-            
-            # Check if text appears in description
-            if text_lower in term.description.lower():
+        for term, synonyms, joined_synonyms, description in self._related_index:
+            # Text in any synonym, any synonym in text, or text in description
+            if (text_lower in joined_synonyms
+                    or any(synonym in text_lower for synonym in synonyms)
+                    or text_lower in description):
                 related_terms.append(term)
+                if len(related_terms) == limit:
+                    break
         
         return related_terms[:limit]
     
@@ -83,34 +160,20 @@ class GlossaryService:
         return self.get_glossary().get_permitted_tables()
     
     def extract_business_terms(self, question: str) -> List[BusinessTerm]:
-        """Extract business terms from natural language question."""
-        terms = []
-        words = question.lower().split()
+        """Extract business terms from natural language question.
         
-        # Look for exact matches first
-        for word in words:
-            term = self.find_term(word)
-            if term and term not in terms:
-                terms.append(term)
-        
-        # Look for multi-word terms
-        for i in range(len(words) - 1):
-            bigram = f"{words[i]} {words[i+1]}"
-            term = self.find_term(bigram)
-            if term and term not in terms:
-                terms.append(term)
-        
-        # Look for related terms
-        related = self.find_related_terms(question)
-        for term in related:
-            if term not in terms:
-                terms.append(term)
-        
-        return terms
+        Canonical names and synonyms of any length are matched in a single
+        pass over the lowercased question.
+        """
+        if self._term_matcher is None:
+            self._load_glossary()
+        return self._term_matcher.find(question.lower())
     
     def build_context_for_llm(self, question: str) -> Dict[str, Any]:
-        """Build context dictionary for LLM prompt."""
-        glossary = self.get_glossary()
+        """Build context dictionary for LLM prompt.
+        
+        Table lists and schemas are shared with other callers, not copied.
+        """
         terms = self.extract_business_terms(question)
         
         context = {
@@ -126,23 +189,9 @@ class GlossaryService:
                 }
                 for term in terms
             ],
-            "permitted_tables": glossary.get_permitted_tables(),
-            "pii_columns": glossary.get_pii_columns(),
-            "table_schemas": {
-                table_name: {
-                    "description": table.description,
-                    "columns": [
-                        {
-                            "name": col.name,
-                            "type": col.type,
-                            "description": col.description,
-                            "is_pii": col.is_pii
-                        }
-                        for col in table.columns
-                    ]
-                }
-                for table_name, table in glossary.table_mappings.items()
-            }
+            "permitted_tables": self._permitted_tables,
+            "pii_columns": self._pii_columns,
+            "table_schemas": self._table_schemas
         }
         
         return context
\ No newline at end of file
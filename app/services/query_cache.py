@@ -0,0 +1,117 @@
+"""Cache for generated SQL keyed by user role and question."""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+# Optional Redis import for demo mode
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Client placeholder until the first cache access connects
+_NOT_CONNECTED = object()
+
+
+class QueryCache:
+    """Exact-match cache for generated SQL and explanations.
+    
+    Entries live in Redis when it is reachable, otherwise in process memory.
+    Redis is connected on first use, so building the cache never blocks.
+    """
+    
+    KEY_PREFIX = "bigpt:query:"
+    
+    def __init__(self, ttl_seconds: Optional[int] = None, redis_url: Optional[str] = None):
+        """Initialize query cache."""
+        self.ttl = ttl_seconds if ttl_seconds is not None else settings.query_cache_ttl_seconds
+        self._redis_url = redis_url or settings.redis_url
+        self._client = _NOT_CONNECTED
+        self._connect_lock = threading.Lock()
+        self._memory: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+    
+    def _get_client(self):
+        """Get the Redis client, connecting on first call; None means in-memory."""
+        if self._client is _NOT_CONNECTED:
+            with self._connect_lock:
+                if self._client is _NOT_CONNECTED:
+                    self._client = self._connect(self._redis_url)
+        return self._client
+    
+    def _connect(self, redis_url: str):
+        """Connect to Redis, falling back to in-memory storage."""
+        if not REDIS_AVAILABLE:
+            return None
+        
+        try:
+            client = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-memory query cache: {e}")
+            return None
+    
+    @staticmethod
+    def make_key(user_role: str, question: str) -> str:
+        """Build cache key from user role and normalized question."""
+        normalized = f"{user_role}|{question.strip().lower()}"
+        return QueryCache.KEY_PREFIX + hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    
+    def get(self, user_role: str, question: str) -> Optional[Dict[str, Any]]:
+        """Get cached entry for question."""
+        if self.ttl <= 0:
+            return None
+        
+        key = self.make_key(user_role, question)
+        raw = None
+        client = self._get_client()
+        
+        if client is not None:
+            try:
+                raw = client.get(key)
+            except Exception as e:
+                logger.warning(f"Query cache read failed: {e}")
+        else:
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is not None:
+                    expires_at, raw = entry
+                    if time.monotonic() >= expires_at:
+                        del self._memory[key]
+                        raw = None
+        
+        return json.loads(raw) if raw is not None else None
+    
+    def set(self, user_role: str, question: str, value: Dict[str, Any]) -> None:
+        """Store entry for question."""
+        if self.ttl <= 0:
+            return
+        
+        key = self.make_key(user_role, question)
+        raw = json.dumps(value, ensure_ascii=False)
+        client = self._get_client()
+        
+        if client is not None:
+            try:
+                client.setex(key, self.ttl, raw)
+            except Exception as e:
+                logger.warning(f"Query cache write failed: {e}")
+        else:
+            with self._lock:
+                self._memory[key] = (time.monotonic() + self.ttl, raw)
+    
+    def clear(self) -> None:
+        """Drop in-memory entries."""
+        with self._lock:
+            self._memory.clear()
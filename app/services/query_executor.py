@@ -1,5 +1,6 @@
 """Query executor service."""
 
+import re
 import time
 from typing import Dict, Any, List, Optional
 import logging
@@ -13,21 +14,32 @@ except ImportError:
     pd = None
 
 try:
-    from sqlalchemy import create_engine, text
+    from sqlalchemy import create_engine, event, text
     from sqlalchemy.exc import SQLAlchemyError
     SQLALCHEMY_AVAILABLE = True
 except ImportError:
     SQLALCHEMY_AVAILABLE = False
     create_engine = None
+    event = None
     text = None
     SQLAlchemyError = Exception
 
 from ..config import settings
 from ..models.query import QueryResult
 from ..models.security import SecurityCheck
+from .sql_parser import ParsedSQL, analyze_sql
 
 logger = logging.getLogger(__name__)
 
+# Reused health probe statement
+_PING_SQL = text("SELECT 1") if SQLALCHEMY_AVAILABLE else None
+
+# Projection list, used when sqlglot cannot parse the query
+_SELECT_CLAUSE_RE = re.compile(r'SELECT\s+(.*?)\s+FROM', re.IGNORECASE | re.DOTALL)
+
+# Rows the server-side cursor buffers per round trip, independent of the row cap
+_STREAM_ROW_BUFFER = 1000
+
 
 class QueryExecutor:
     """Service for executing SQL queries safely."""
@@ -39,17 +51,37 @@ class QueryExecutor:
         
         # Initialize engine only if SQLAlchemy is available
         if SQLALCHEMY_AVAILABLE:
-            self.engine = create_engine(settings.database_url)
+            # Keep a warm pool so probes and queries skip connection setup
+            self.engine = create_engine(
+                settings.database_url,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_pre_ping=True
+            )
+            # Session settings are applied once per physical connection
+            event.listen(self.engine, "connect", self._configure_connection)
         else:
             self.engine = None
     
+    def _configure_connection(self, dbapi_connection, connection_record) -> None:
+        """Apply the statement timeout to a new pooled connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET statement_timeout = {int(self.timeout * 1000)}")
+        finally:
+            cursor.close()
+    
     def execute_query(
         self, 
         sql: str, 
         security_check: Optional[SecurityCheck] = None,
-        max_rows: Optional[int] = None
+        max_rows: Optional[int] = None,
+        parsed: Optional[ParsedSQL] = None
     ) -> QueryResult:
-        """Execute SQL query safely."""
+        """Execute SQL query safely.
+        
+        ``parsed`` is an optional ``analyze_sql`` result reused in demo mode.
+        """
         if security_check and not security_check.is_safe:
             raise ValueError(f"Query is not safe to execute: {security_check.level}")
         
@@ -60,7 +92,7 @@ class QueryExecutor:
             execution_time = (time.time() - start_time) * 1000
             
             # Extract columns from SQL for demo
-            columns = self._extract_columns_from_sql(sql)
+            columns = self._extract_columns_from_sql(sql, parsed)
             
             return QueryResult(
                 data=[],  # Empty data for demo
@@ -72,27 +104,23 @@ class QueryExecutor:
             )
         
         try:
-            # Set query timeout
+            # Pooled connection; statement timeout is set on connect
             with self.engine.connect() as conn:
-                # Set session parameters for safety
-                conn.execute(text("SET statement_timeout = :timeout"), 
-                           {"timeout": f"{self.timeout * 1000}ms"})
-                conn.execute(text("SET max_rows = :max_rows"), 
-                           {"max_rows": max_rows or self.max_rows})
-                
-                # Execute query
-                result = conn.execute(text(sql))
-                
-                # Fetch results
-                rows = result.fetchall()
+                # Execute through a server-side cursor so rows past the cap
+                # are never transferred to the client
+                limit = max_rows or self.max_rows
+                statement = text(sql).execution_options(stream_results=True, max_row_buffer=_STREAM_ROW_BUFFER)
+                result = conn.execute(statement)
                 columns = list(result.keys())
                 
-                # Convert to list of dictionaries
-                data = [dict(zip(columns, row)) for row in rows]
+                # Fetch at most max_rows rows as dictionaries
+                data = [dict(row) for row in result.mappings().fetchmany(limit)]
+                result.close()
                 
                 execution_time = (time.time() - start_time) * 1000  # Convert to ms
                 
-                return QueryResult(
+                # Rows come straight from the driver; skip per-row validation
+                return QueryResult.model_construct(
                     data=data,
                     columns=columns,
                     row_count=len(data),
@@ -106,11 +134,16 @@ class QueryExecutor:
             logger.error(f"SQL execution error: {e}")
             raise ValueError(f"Query execution failed: {str(e)}")
     
-    def validate_query_syntax(self, sql: str) -> bool:
-        """Validate SQL query syntax without executing."""
+    def validate_query_syntax(self, sql: str, parsed: Optional[ParsedSQL] = None) -> bool:
+        """Validate SQL query syntax without executing.
+        
+        ``parsed`` is an optional ``analyze_sql`` result reused in demo mode.
+        """
         if not self.engine:
             # Demo mode - basic validation
-            return sql.strip().upper().startswith('SELECT')
+            if parsed is not None:
+                return parsed.is_select
+            return sql.lstrip()[:6].upper().startswith('SELECT')
             
         try:
             with self.engine.connect() as conn:
@@ -156,21 +189,34 @@ class QueryExecutor:
             
         try:
             with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+                conn.execute(_PING_SQL)
                 return True
         except Exception as e:
             logger.error(f"Database connection test failed: {e}")
             return False
     
-    def _extract_columns_from_sql(self, sql: str) -> List[str]:
+    def _extract_columns_from_sql(self, sql: str, parsed: Optional[ParsedSQL] = None) -> List[str]:
         """Extract column names from SQL for demo mode."""
-        import re
+        if parsed is None:
+            parsed = analyze_sql(sql)
+        if parsed is not None:
+            columns = list(parsed.columns)
+        else:
+            columns = self._split_select_clause(sql)
+        
+        # Fallback columns if nothing found
+        if not columns:
+            columns = ['column1', 'column2', 'column3']
         
-        # Simple column extraction for demo
+        return columns
+    
+    @staticmethod
+    def _split_select_clause(sql: str) -> List[str]:
+        """Extract column names by splitting the SELECT clause on commas."""
         columns = []
         
         # Look for SELECT ... FROM pattern
-        select_match = re.search(r'SELECT\s+(.*?)\s+FROM', sql, re.IGNORECASE | re.DOTALL)
+        select_match = _SELECT_CLAUSE_RE.search(sql)
         if select_match:
             select_clause = select_match.group(1)
             
@@ -194,8 +240,4 @@ class QueryExecutor:
                 if col and col not in columns:
                     columns.append(col)
         
-        # Fallback columns if nothing found
-        if not columns:
-            columns = ['column1', 'column2', 'column3']
-        
-        return columns
\ No newline at end of file
+        return columns
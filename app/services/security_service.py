@@ -1,14 +1,24 @@
 """Security service for SQL query validation."""
 
 import re
-from typing import List, Optional, Dict, Any
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 
 from ..models.security import SecurityCheck, SecurityLevel, PIIFlag
 from ..models.glossary import Glossary
+from .sql_parser import ParsedSQL, analyze_sql, count_subqueries, exp, get_column_references, strip_literals
 
 logger = logging.getLogger(__name__)
 
+# Table names after FROM and JOIN, used when no parsed SQL is available
+_FROM_TABLE_RE = re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE)
+_JOIN_TABLE_RE = re.compile(r'\bJOIN\s+(\w+)', re.IGNORECASE)
+
+# Comment prepended to sanitized queries
+_GENERATION_HEADER = "/* AGENT:GEN v=1 */\n"
+
 
 class SecurityService:
     """Service for SQL query security validation."""
@@ -35,37 +45,117 @@ class SecurityService:
         r'\b(JOIN.*JOIN.*JOIN)\b',  # Multiple JOINs
     ]
     
+    # Patterns are compiled once at import and shared by all instances
+    dangerous_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in DANGEROUS_OPERATIONS]
+    warning_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in WARNING_PATTERNS]
+    # Every dangerous operation in one alternation; group dN is DANGEROUS_OPERATIONS[N].
+    # No two of the patterns can match overlapping text, so finditer finds them all.
+    _dangerous_pattern = re.compile(
+        "|".join(f"(?P<d{i}>{pattern})" for i, pattern in enumerate(DANGEROUS_OPERATIONS)),
+        re.IGNORECASE
+    )
+    # Single alternation over every pattern; clean queries need only this scan
+    _any_pattern = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in DANGEROUS_OPERATIONS + WARNING_PATTERNS),
+        re.IGNORECASE
+    )
+    # Cost/limit keywords scanned together; none of them can overlap
+    _token_pattern = re.compile(
+        r'(?P<join>\bJOIN\b)'
+        r'|(?P<group_by>\bGROUP\s+BY\b)'
+        r'|(?P<order_by>\bORDER\s+BY\b)'
+        r'|(?P<window>\bOVER\s*\()'
+        r'|(?P<limit>\bLIMIT\s+\d+\b)',
+        re.IGNORECASE
+    )
+    # Kept separate: a subquery span may contain the keywords above
+    _subquery_pattern = re.compile(r'\([^)]*SELECT[^)]*\)', re.IGNORECASE)
+    
+    # Number of recent (sql, role) results kept by check_query_security
+    CHECK_CACHE_SIZE = 1024
+    
     def __init__(self, glossary: Glossary):
         """Initialize security service."""
         self.glossary = glossary
-        self._compile_patterns()
+        self._check_cache: "OrderedDict[Tuple[str, str], SecurityCheck]" = OrderedDict()
+        self._check_cache_lock = threading.Lock()
+        self._pii_pattern = self._compile_pii_pattern(glossary.get_pii_columns())
+        self._pii_set = glossary.get_pii_column_set()
     
-    def _compile_patterns(self) -> None:
-        """Compile regex patterns for performance."""
-        self.dangerous_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.DANGEROUS_OPERATIONS]
-        self.warning_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.WARNING_PATTERNS]
+    @staticmethod
+    def _compile_pii_pattern(pii_columns: List[str]) -> re.Pattern:
+        """Compile one pattern matching any PII column reference."""
+        if not pii_columns:
+            # Never matches, so the check needs no None guard
+            return re.compile(r'(?!)')
+        return re.compile(r'\b(?:' + '|'.join(map(re.escape, pii_columns)) + r')\b', re.IGNORECASE)
     
     def check_query_security(self, sql_query: str, user_role: str = "manager") -> SecurityCheck:
-        """Check SQL query for security issues."""
-        sql_upper = sql_query.upper()
+        """Check SQL query for security issues, reusing recent results."""
+        key = (sql_query, user_role)
+        with self._check_cache_lock:
+            check = self._check_cache.get(key)
+            if check is not None:
+                self._check_cache.move_to_end(key)
+                return check
+        
+        check = self._run_checks(sql_query, user_role)
+        with self._check_cache_lock:
+            self._check_cache[key] = check
+            if len(self._check_cache) > self.CHECK_CACHE_SIZE:
+                self._check_cache.popitem(last=False)
+        return check
+    
+    def check_many(self, sql_queries: List[str], user_role: str = "manager") -> List[SecurityCheck]:
+        """Check several SQL queries, in order.
+        
+        Repeated queries are checked once; each query is parsed at most once
+        and shares the parse with the rest of the pipeline.
+        """
+        checks: Dict[str, SecurityCheck] = {}
+        for sql_query in sql_queries:
+            if sql_query not in checks:
+                checks[sql_query] = self.check_query_security(sql_query, user_role)
+        return [checks[sql_query] for sql_query in sql_queries]
+    
+    def _run_checks(self, sql_query: str, user_role: str) -> SecurityCheck:
+        """Run all security checks on SQL query.
+        
+        Statement type, PII columns and cost come from the parsed SQL when
+        sqlglot can parse it; keyword patterns always run on the text.
+        Dangerous operations are matched on the raw SQL and on the SQL with
+        literals and comments stripped, so the blocklist never depends on
+        sqlglot lexing the query the way the database does. Only warnings
+        and PII use the stripped text alone.
+        """
+        parsed = analyze_sql(sql_query)
+        stripped = strip_literals(sql_query)
         
         # Check for dangerous operations
-        blocked_operations = []
-        for pattern in self.dangerous_patterns:
-            if pattern.search(sql_query):
-                blocked_operations.append(pattern.pattern)
+        matched = set()
+        for text in {sql_query, stripped}:
+            if self._any_pattern.search(text) is not None:
+                matched.update(int(m.lastgroup[1:]) for m in self._dangerous_pattern.finditer(text))
+        blocked_operations = [self.DANGEROUS_OPERATIONS[i] for i in sorted(matched)]
+        # Statements the patterns miss, e.g. VACUUM or MERGE
+        if not blocked_operations and parsed is not None and not parsed.is_select:
+            blocked_operations.append(f"Non-SELECT statement: {parsed.ast.key.upper()}")
+        
+        # Keywords inside string literals or comments are not SQL
+        sql_query = stripped
         
         # Check for PII access
-        pii_flag = self._check_pii_access(sql_query)
+        pii_flag = self._check_pii_access(sql_query, parsed)
         
         # Check for warnings
         warnings = []
-        for pattern in self.warning_patterns:
-            if pattern.search(sql_query):
-                warnings.append(f"Potentially inefficient pattern: {pattern.pattern}")
+        if self._any_pattern.search(sql_query) is not None:
+            for pattern in self.warning_patterns:
+                if pattern.search(sql_query):
+                    warnings.append(f"Potentially inefficient pattern: {pattern.pattern}")
         
         # Estimate query cost
-        estimated_cost = self._estimate_query_cost(sql_query)
+        estimated_cost = self._estimate_query_cost(sql_query, parsed=parsed)
         
         # Determine security level
         if blocked_operations or pii_flag == PIIFlag.BLOCKED:
@@ -89,75 +179,99 @@ class SecurityService:
             is_safe=is_safe
         )
     
-    def _check_pii_access(self, sql_query: str) -> PIIFlag:
+    def _check_pii_access(self, sql_query: str, parsed: Optional[ParsedSQL] = None) -> PIIFlag:
         """Check if query accesses PII columns."""
-        pii_columns = self.glossary.get_pii_columns()
-        
-        for pii_column in pii_columns:
-            # Check if PII column is referenced in SELECT, WHERE, or JOIN
-            if re.search(rf'\b{pii_column}\b', sql_query, re.IGNORECASE):
-                return PIIFlag.DETECTED
+        if parsed is None:
+            # Any qualified PII column referenced in SELECT, WHERE, or JOIN
+            return PIIFlag.DETECTED if self._pii_pattern.search(sql_query) else PIIFlag.NONE
         
+        # Unqualified columns may belong to any table in the query
+        tables = [table.lower() for table in parsed.tables]
+        for table, column in get_column_references(parsed.ast):
+            column = column.lower()
+            for candidate in ([table.lower()] if table else tables):
+                if f"{candidate}.{column}" in self._pii_set:
+                    return PIIFlag.DETECTED
         return PIIFlag.NONE
     
-    def _estimate_query_cost(self, sql_query: str) -> int:
-        """Estimate query execution cost."""
-        cost = 0
-        
-        # Base cost
-        cost += 10
+    def _scan_tokens(self, sql_query: str) -> Counter:
+        """Count cost-relevant keywords in one pass over the SQL."""
+        return Counter(m.lastgroup for m in self._token_pattern.finditer(sql_query))
+    
+    def _estimate_query_cost(
+        self,
+        sql_query: str,
+        tokens: Optional[Counter] = None,
+        parsed: Optional[ParsedSQL] = None
+    ) -> int:
+        """Estimate query execution cost.
         
-        # Cost for JOINs
-        join_count = len(re.findall(r'\bJOIN\b', sql_query, re.IGNORECASE))
-        cost += join_count * 50
+        Counts nodes of ``parsed`` when given, otherwise keywords in the text.
+        """
+        if parsed is not None:
+            ast = parsed.ast
+            joins = sum(1 for _ in ast.find_all(exp.Join))
+            has_group_by = ast.find(exp.Group) is not None
+            has_order_by = ast.find(exp.Order) is not None
+            subqueries = count_subqueries(ast)
+            windows = sum(1 for _ in ast.find_all(exp.Window))
+        else:
+            if tokens is None:
+                tokens = self._scan_tokens(sql_query)
+            joins = tokens["join"]
+            has_group_by = tokens["group_by"] > 0
+            has_order_by = tokens["order_by"] > 0
+            subqueries = len(self._subquery_pattern.findall(sql_query))
+            windows = tokens["window"]
         
-        # Cost for GROUP BY
-        if re.search(r'\bGROUP\s+BY\b', sql_query, re.IGNORECASE):
+        cost = 10  # Base cost
+        cost += joins * 50
+        if has_group_by:
             cost += 100
-        
-        # Cost for ORDER BY
-        if re.search(r'\bORDER\s+BY\b', sql_query, re.IGNORECASE):
+        if has_order_by:
             cost += 50
-        
-        # Cost for subqueries
-        subquery_count = len(re.findall(r'\([^)]*SELECT[^)]*\)', sql_query, re.IGNORECASE))
-        cost += subquery_count * 200
-        
-        # Cost for window functions
-        window_count = len(re.findall(r'\bOVER\s*\(', sql_query, re.IGNORECASE))
-        cost += window_count * 150
+        cost += subqueries * 200
+        cost += windows * 150
         
         return cost
     
     def sanitize_query(self, sql_query: str) -> str:
-        """Sanitize SQL query by adding safety measures."""
+        """Sanitize SQL query by adding safety measures.
+        
+        The query text is only scanned for keywords, never parsed.
+        """
         # Ensure query starts with SELECT
-        if not sql_query.strip().upper().startswith('SELECT'):
+        if not sql_query.lstrip()[:6].upper().startswith('SELECT'):
             raise ValueError("Only SELECT queries are allowed")
         
         # Add LIMIT if not present and query might return many rows
-        if not re.search(r'\bLIMIT\s+\d+\b', sql_query, re.IGNORECASE):
+        tokens = self._scan_tokens(sql_query)
+        if not tokens["limit"]:
             # Check if query has potential for large result set
-            if self._estimate_query_cost(sql_query) > 500:
+            if self._estimate_query_cost(sql_query, tokens) > 500:
                 sql_query += " LIMIT 10000"
         
         # Add comment with generation info
-        sql_query = f"/* AGENT:GEN v=1 */\n{sql_query}"
-        
-        return sql_query
+        return _GENERATION_HEADER + sql_query
     
-    def validate_table_access(self, sql_query: str) -> List[str]:
-        """Validate that query only accesses permitted tables."""
+    def validate_table_access(self, sql_query: str, parsed: Optional[ParsedSQL] = None) -> List[str]:
+        """Validate that query only accesses permitted tables.
+        
+        ``parsed`` is an optional ``analyze_sql`` result; the SQL is parsed
+        when it is not given. FROM and JOIN clauses are scanned only if the
+        SQL cannot be parsed.
+        """
         permitted_tables = self.glossary.get_permitted_tables()
         accessed_tables = []
         
-        # Extract table names from FROM and JOIN clauses
-        from_pattern = r'\bFROM\s+(\w+)'
-        join_pattern = r'\bJOIN\s+(\w+)'
-        
-        for pattern in [from_pattern, join_pattern]:
-            matches = re.findall(pattern, sql_query, re.IGNORECASE)
-            accessed_tables.extend(matches)
+        if parsed is None:
+            parsed = analyze_sql(sql_query)
+        if parsed is not None:
+            accessed_tables.extend(parsed.tables)
+        else:
+            # Extract table names from FROM and JOIN clauses
+            accessed_tables.extend(_FROM_TABLE_RE.findall(sql_query))
+            accessed_tables.extend(_JOIN_TABLE_RE.findall(sql_query))
         
         # Check for unauthorized tables
         unauthorized = []
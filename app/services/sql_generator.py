@@ -6,19 +6,31 @@ from typing import Dict, Any, Optional, List
 import logging
 
 from ..config import settings
+from ..core.responses import dumps_json_indented, loads_json
 from ..models.glossary import Glossary
 from ..models.query import QueryRequest
+from .term_matcher import TermMatcher, glossary_term_matcher
 
 # Optional OpenAI import for demo mode
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, OpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
+    AsyncOpenAI = None
     OpenAI = None
 
 logger = logging.getLogger(__name__)
 
+# SQL between <<<SQL>>> markers in the LLM response
+_SQL_BLOCK_RE = re.compile(r'<<<SQL>>>(.*?)<<<SQL>>>', re.DOTALL)
+
+# Fallback: unmarked SQL starts at a line beginning with SELECT and runs
+# to the first line ending in a semicolon, blank line or end of response
+_SELECT_LINE_RE = re.compile(r'^[ \t]*SELECT', re.IGNORECASE | re.MULTILINE)
+_STATEMENT_END_RE = re.compile(r';[ \t\r]*(?:\n|$)')
+_BLANK_LINE_RE = re.compile(r'\n[ \t]*\n')
+
 
 class SQLGenerator:
     """Service for generating SQL from natural language using LLM."""
@@ -26,11 +38,27 @@ class SQLGenerator:
     def __init__(self, glossary: Glossary):
         """Initialize SQL generator."""
         self.glossary = glossary
+        self._term_matcher = glossary_term_matcher(glossary)
+        # Canonical names only, for scoring generated SQL
+        self._canonical_matcher = TermMatcher(
+            (term.canonical_name, term) for term in glossary.terms.values()
+        )
+        
+        # Prompt pieces that only change with the glossary
+        self._table_schemas = glossary.get_table_schemas()
+        self._permitted_tables = glossary.get_permitted_tables()
+        self._pii_columns = glossary.get_pii_columns()
+        self._table_schemas_json = dumps_json_indented(self._table_schemas)
+        self._permitted_tables_str = ', '.join(self._permitted_tables)
+        self._pii_columns_str = ', '.join(self._pii_columns)
+        
         if OPENAI_AVAILABLE and settings.openai_api_key and settings.openai_api_key != "your_openai_api_key_here":
             self.client = OpenAI(api_key=settings.openai_api_key)
+            self.async_client = AsyncOpenAI(api_key=settings.openai_api_key)
             self.model = settings.openai_model
         else:
             self.client = None
+            self.async_client = None
             self.model = None
     
     def generate_sql(self, request: QueryRequest) -> Dict[str, Any]:
@@ -38,12 +66,7 @@ class SQLGenerator:
         try:
             # Check if OpenAI is available and configured
             if not self.client:
-                return {
-                    "sql": None,
-                    "confidence": 0.0,
-                    "error": "OpenAI API not configured",
-                    "needs_clarification": False
-                }
+                return self._error_result("OpenAI API not configured")
             
             # Build context for LLM
             context = self._build_llm_context(request)
@@ -58,33 +81,36 @@ class SQLGenerator:
             
         except Exception as e:
             logger.error(f"Failed to generate SQL: {e}")
-            return {
-                "sql": None,
-                "confidence": 0.0,
-                "error": str(e),
-                "needs_clarification": False
-            }
+            return self._error_result(str(e))
+    
+    async def generate_sql_async(self, request: QueryRequest) -> Dict[str, Any]:
+        """Generate SQL like ``generate_sql``, awaiting the LLM call."""
+        try:
+            if not self.async_client:
+                return self._error_result("OpenAI API not configured")
+            
+            context = self._build_llm_context(request)
+            sql_response = await self._call_llm_async(context)
+            return self._parse_llm_response(sql_response)
+            
+        except Exception as e:
+            logger.error(f"Failed to generate SQL: {e}")
+            return self._error_result(str(e))
+    
+    @staticmethod
+    def _error_result(error: str) -> Dict[str, Any]:
+        """Build the result returned when no SQL could be generated."""
+        return {
+            "sql": None,
+            "confidence": 0.0,
+            "error": error,
+            "needs_clarification": False
+        }
     
     def _build_llm_context(self, request: QueryRequest) -> Dict[str, Any]:
         """Build context for LLM prompt."""
         # Extract business terms from question
-        terms = self.glossary.extract_business_terms(request.question)
-        
-        # Build table schemas
-        table_schemas = {}
-        for table_name, table_mapping in self.glossary.table_mappings.items():
-            table_schemas[table_name] = {
-                "description": table_mapping.description,
-                "columns": [
-                    {
-                        "name": col.name,
-                        "type": col.type,
-                        "description": col.description,
-                        "is_pii": col.is_pii
-                    }
-                    for col in table_mapping.columns
-                ]
-            }
+        terms = self._term_matcher.find(request.question.lower())
         
         context = {
             "question": request.question,
@@ -101,32 +127,42 @@ class SQLGenerator:
                 }
                 for term in terms
             ],
-            "permitted_tables": self.glossary.get_permitted_tables(),
-            "pii_columns": self.glossary.get_pii_columns(),
-            "table_schemas": table_schemas
+            "permitted_tables": self._permitted_tables,
+            "pii_columns": self._pii_columns,
+            "table_schemas": self._table_schemas
         }
         
         return context
     
     def _call_llm(self, context: Dict[str, Any]) -> str:
         """Call LLM to generate SQL."""
-        system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(context)
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=messages,
+            messages=self._build_messages(context),
+            temperature=0.1,
+            max_tokens=1000
+        )
+        
+        return response.choices[0].message.content
+    
+    async def _call_llm_async(self, context: Dict[str, Any]) -> str:
+        """Call LLM to generate SQL without blocking the event loop."""
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(context),
             temperature=0.1,
             max_tokens=1000
         )
         
         return response.choices[0].message.content
     
+    def _build_messages(self, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Build chat messages for the LLM call."""
+        return [
+            {"role": "system", "content": self._build_system_prompt()},
+            {"role": "user", "content": self._build_user_prompt(context)}
+        ]
+    
     def _build_system_prompt(self) -> str:
         """Build system prompt for LLM."""
         return """You are an expert SQL generator for business intelligence queries. Your task is to convert natural language questions into safe, optimized SQL queries.
@@ -180,13 +216,13 @@ User Role: {context['user_role']}
 Max Rows: {context['max_rows']}
 
 Business Terms Found:
-{json.dumps(context['business_terms'], indent=2, ensure_ascii=False)}
+{dumps_json_indented(context['business_terms'])}
 
-Permitted Tables: {', '.join(context['permitted_tables'])}
-PII Columns (DO NOT ACCESS): {', '.join(context['pii_columns'])}
+Permitted Tables: {self._permitted_tables_str}
+PII Columns (DO NOT ACCESS): {self._pii_columns_str}
 
 Table Schemas:
-{json.dumps(context['table_schemas'], indent=2, ensure_ascii=False)}
+{self._table_schemas_json}
 
 Generate SQL query for this question:"""
         
@@ -199,7 +235,7 @@ Generate SQL query for this question:"""
         # Check if response is a clarification request
         if response.startswith('{') and '"clarify"' in response:
             try:
-                clarification = json.loads(response)
+                clarification = loads_json(response)
                 return {
                     "sql": None,
                     "confidence": 0.0,
@@ -210,7 +246,7 @@ Generate SQL query for this question:"""
                 pass
         
         # Extract SQL from markers
-        sql_match = re.search(r'<<<SQL>>>(.*?)<<<SQL>>>', response, re.DOTALL)
+        sql_match = _SQL_BLOCK_RE.search(response)
         if sql_match:
             sql = sql_match.group(1).strip()
             
@@ -225,22 +261,17 @@ Generate SQL query for this question:"""
             }
         
         # If no SQL markers found, try to extract SQL from response
-        sql_lines = []
-        in_sql = False
-        
-        for line in response.split('\n'):
-            line = line.strip()
-            if line.upper().startswith('SELECT'):
-                in_sql = True
-                sql_lines.append(line)
-            elif in_sql and (line.endswith(';') or line == ''):
-                sql_lines.append(line)
-                break
-            elif in_sql:
-                sql_lines.append(line)
-        
-        if sql_lines:
-            sql = '\n'.join(sql_lines)
+        select_match = _SELECT_LINE_RE.search(response)
+        if select_match:
+            start = select_match.start()
+            end = len(response)
+            statement_end = _STATEMENT_END_RE.search(response, start)
+            if statement_end:
+                end = statement_end.start() + 1
+            blank_line = _BLANK_LINE_RE.search(response, start, end)
+            if blank_line:
+                end = blank_line.start()
+            sql = response[start:end].strip()
             confidence = self._calculate_confidence(sql, response)
             
             return {
@@ -261,30 +292,29 @@ Generate SQL query for this question:"""
         """Calculate confidence score for generated SQL."""
         confidence = 0.5  # Base confidence
         
+        sql_upper = sql.upper()
+        
         # Check for proper SQL structure
-        if sql.upper().startswith('SELECT'):
+        if sql_upper.startswith('SELECT'):
             confidence += 0.2
         
         # Check for business terms usage
-        business_terms = [term.canonical_name for term in self.glossary.terms.values()]
-        for term in business_terms:
-            if term.lower() in sql.lower():
-                confidence += 0.1
+        confidence += 0.1 * len(self._canonical_matcher.find(sql.lower()))
         
         # Check for proper JOINs
-        if 'JOIN' in sql.upper():
+        if 'JOIN' in sql_upper:
             confidence += 0.1
         
         # Check for WHERE clause
-        if 'WHERE' in sql.upper():
+        if 'WHERE' in sql_upper:
             confidence += 0.1
         
         # Check for GROUP BY (indicates aggregation)
-        if 'GROUP BY' in sql.upper():
+        if 'GROUP BY' in sql_upper:
             confidence += 0.1
         
         # Penalize for potential issues
-        if 'SELECT *' in sql.upper():
+        if 'SELECT *' in sql_upper:
             confidence -= 0.2
         
         if len(sql) < 50:  # Too short
@@ -0,0 +1,168 @@
+"""SQL parsing helpers shared by the query pipeline."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import logging
+
+# Optional sqlglot import for demo mode
+try:
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.dialects.dialect import Dialect
+    from sqlglot.errors import SqlglotError
+    from sqlglot.tokens import TokenType
+    SQLGLOT_AVAILABLE = True
+except ImportError:
+    SQLGLOT_AVAILABLE = False
+    sqlglot = None
+    exp = None
+    Dialect = None
+    SqlglotError = Exception
+    TokenType = None
+
+logger = logging.getLogger(__name__)
+
+SQL_DIALECT = "postgres"
+
+# Token types whose text is literal data rather than SQL
+_LITERAL_TOKEN_TYPES = frozenset(
+    getattr(TokenType, name) for name in (
+        "STRING", "BIT_STRING", "HEX_STRING", "BYTE_STRING", "NATIONAL_STRING",
+        "RAW_STRING", "HEREDOC_STRING", "UNICODE_STRING"
+    )
+) if SQLGLOT_AVAILABLE else frozenset()
+
+
+@dataclass(frozen=True)
+class ParsedSQL:
+    """SQL parsed once, with the facts pipeline stages read from it."""
+    ast: "exp.Expression"
+    tables: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    where: Optional[str]
+    is_select: bool
+
+
+@lru_cache(maxsize=256)
+def parse_sql(sql: str) -> Optional["exp.Expression"]:
+    """Parse SQL into an AST.
+    
+    Returns None when sqlglot is not installed or the SQL cannot be parsed,
+    so callers can fall back to text-based checks. Results are cached and
+    shared between callers, so the returned tree must not be mutated.
+    """
+    if not SQLGLOT_AVAILABLE:
+        return None
+    
+    try:
+        return sqlglot.parse_one(sql, read=SQL_DIALECT)
+    except SqlglotError as e:
+        logger.debug(f"Failed to parse SQL: {e}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def strip_literals(sql: str) -> str:
+    """Blank out string literals and replace comments with a space.
+    
+    Keyword scans over the result cannot match text inside strings or
+    comments. Returns the SQL unchanged when sqlglot is not installed or
+    cannot tokenize it, so callers never scan less than the original text.
+    """
+    if not SQLGLOT_AVAILABLE:
+        return sql
+    
+    try:
+        tokens = Dialect.get_or_raise(SQL_DIALECT).tokenize(sql)
+    except SqlglotError as e:
+        logger.debug(f"Failed to tokenize SQL: {e}")
+        return sql
+    
+    parts = []
+    position = 0
+    for token in tokens:
+        # Whitespace between tokens is kept; anything else there is a comment
+        gap = sql[position:token.start]
+        parts.append(gap if not gap.strip() else " ")
+        parts.append("''" if token.token_type in _LITERAL_TOKEN_TYPES else sql[token.start:token.end + 1])
+        position = token.end + 1
+    if sql[position:].strip():
+        parts.append(" ")
+    return "".join(parts)
+
+
+def get_tables(parsed: "exp.Expression") -> List[str]:
+    """Get distinct table names referenced by a parsed query."""
+    tables = []
+    for table in parsed.find_all(exp.Table):
+        if table.name and table.name not in tables:
+            tables.append(table.name)
+    return tables
+
+
+def get_select_columns(parsed: "exp.Expression") -> List[str]:
+    """Get distinct output column names of a parsed query's projection."""
+    select = parsed if isinstance(parsed, exp.Select) else parsed.find(exp.Select)
+    if select is None:
+        return []
+    
+    columns = []
+    for projection in select.expressions:
+        name = projection.output_name or projection.sql(dialect=SQL_DIALECT)
+        if name not in columns:
+            columns.append(name)
+    return columns
+
+
+def get_where_clause(parsed: "exp.Expression") -> Optional[str]:
+    """Get the WHERE condition of a parsed query as SQL text."""
+    where = parsed.find(exp.Where)
+    if where is None:
+        return None
+    return where.this.sql(dialect=SQL_DIALECT)
+
+
+def get_column_references(parsed: "exp.Expression") -> List[Tuple[Optional[str], str]]:
+    """Get (table, column) pairs for every column a query references.
+    
+    Table aliases are resolved to table names; unqualified columns have
+    table None.
+    """
+    aliases = {table.alias_or_name: table.name for table in parsed.find_all(exp.Table)}
+    references = []
+    for column in parsed.find_all(exp.Column):
+        qualifier = column.table
+        references.append((aliases.get(qualifier, qualifier) if qualifier else None, column.name))
+    return references
+
+
+def count_subqueries(parsed: "exp.Expression") -> int:
+    """Count SELECTs nested in another query, including CTE bodies."""
+    return sum(
+        1 for select in parsed.find_all(exp.Select)
+        if select.parent is not None and not isinstance(select.parent, exp.Union)
+    )
+
+
+def is_select(parsed: "exp.Expression") -> bool:
+    """Check whether a parsed statement is a read-only query."""
+    return isinstance(parsed, (exp.Select, exp.Union))
+
+
+@lru_cache(maxsize=256)
+def analyze_sql(sql: str) -> Optional[ParsedSQL]:
+    """Parse SQL and collect tables, columns and filters in one place.
+    
+    Returns None when the SQL cannot be parsed, like ``parse_sql``.
+    """
+    parsed = parse_sql(sql)
+    if parsed is None:
+        return None
+    return ParsedSQL(
+        ast=parsed,
+        tables=tuple(get_tables(parsed)),
+        columns=tuple(get_select_columns(parsed)),
+        where=get_where_clause(parsed),
+        is_select=is_select(parsed)
+    )
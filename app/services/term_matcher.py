@@ -0,0 +1,72 @@
+"""Multi-pattern matching of business term surface forms in text."""
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+
+# Optional pyahocorasick import; falls back to substring scans
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+
+if TYPE_CHECKING:
+    from ..models.glossary import Glossary
+
+
+class TermMatcher:
+    """Find every known surface form occurring in a text in one pass.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, so the
+    cost is linear in the text length rather than in the number of forms.
+    """
+    
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        """Build matcher from (surface form, value) pairs."""
+        self._patterns: Dict[str, List[Any]] = {}
+        for form, value in patterns:
+            form = form.lower().strip()
+            if form:
+                self._patterns.setdefault(form, []).append(value)
+        
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE and self._patterns:
+            self._automaton = ahocorasick.Automaton()
+            for form, values in self._patterns.items():
+                self._automaton.add_word(form, values)
+            self._automaton.make_automaton()
+    
+    def find(self, text: str) -> List[Any]:
+        """Find values whose surface forms occur in lowercase text.
+        
+        Each value is returned once, in order of first occurrence.
+        """
+        if self._automaton is not None:
+            hits = (values for _, values in self._automaton.iter(text))
+        else:
+            # Order by end position, as the automaton reports matches
+            matched = [
+                (text.find(form) + len(form), values)
+                for form, values in self._patterns.items()
+                if form in text
+            ]
+            matched.sort(key=lambda hit: hit[0])
+            hits = (values for _, values in matched)
+        
+        found = []
+        seen = set()
+        for values in hits:
+            for value in values:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    found.append(value)
+        return found
+
+
+def glossary_term_matcher(glossary: "Glossary") -> TermMatcher:
+    """Build matcher over canonical names and synonyms of all glossary terms."""
+    return TermMatcher(
+        (form, term)
+        for term in glossary.terms.values()
+        for form in [term.canonical_name, *term.synonyms]
+    )
@@ -3,13 +3,66 @@
 
 import asyncio
 import json
-from typing import Dict, Any
+import sys
+from collections import defaultdict
+from typing import Dict, Any, List
 
-from app.services.glossary_service import GlossaryService
-from app.services.sql_generator import SQLGenerator
-from app.services.security_service import SecurityService
+from app.services._singletons import get_glossary_service, get_security_service, get_sql_generator
 from app.models.query import QueryRequest
 
+# Golden SQL for the first demo question, printed as is
+_EXPECTED_SQL_Q1 = """
+                SELECT 
+                  DATE(s.order_date) AS day,
+                  SUM(s.revenue - s.cogs) AS gross_profit
+                FROM sales s
+                WHERE s.order_date >= current_date - INTERVAL '2 day'
+                  AND s.order_date < current_date
+                GROUP BY DATE(s.order_date)
+                ORDER BY day;
+                """.strip()
+
+
+async def _run_demo_query(i: int, question: str, glossary_service, security_service) -> List[str]:
+    """Run one demo query and return its output lines."""
+    out = []
+    out.append(f"\n🔍 Query {i}: {question}")
+    out.append("-" * 40)
+    
+    try:
+        # Create request
+        request = QueryRequest(
+            question=question,
+            user_id="demo_user",
+            user_role="manager"
+        )
+        
+        # Extract business terms
+        terms = glossary_service.extract_business_terms(question)
+        out.append(f"📝 Business terms found: {[term.canonical_name for term in terms]}")
+        
+        # Generate SQL (mock - since we don't have OpenAI API key in demo)
+        out.append("🤖 Generating SQL...")
+        out.append("⚠️  Note: This is a demo - actual SQL generation requires OpenAI API key")
+        
+        # Show expected SQL from golden queries
+        if i == 1:
+            out.append(f"📋 Expected SQL:\n{_EXPECTED_SQL_Q1}")
+        
+        # Security check (using expected SQL)
+        if i == 1:
+            security_check = await asyncio.to_thread(security_service.check_query_security, _EXPECTED_SQL_Q1)
+            out.append(f"🔒 Security check: {security_check.level}")
+            out.append(f"✅ Safe to execute: {security_check.is_safe}")
+            if security_check.warnings:
+                out.append(f"⚠️  Warnings: {security_check.warnings}")
+        
+        out.append("✅ Query processed successfully")
+        
+    except Exception as e:
+        out.append(f"❌ Error: {e}")
+    return out
+
 
 async def demo_basic_functionality():
     """Demonstrate basic BI-GPT functionality."""
@@ -18,13 +71,13 @@ async def demo_basic_functionality():
     
     # Initialize services
     print("📚 Loading business glossary...")
-    glossary_service = GlossaryService()
+    glossary_service = get_glossary_service()
     glossary = glossary_service.get_glossary()
     print(f"✅ Loaded glossary v{glossary.version} with {len(glossary.terms)} terms")
     
     print("\n🔧 Initializing services...")
-    sql_generator = SQLGenerator(glossary)
-    security_service = SecurityService(glossary)
+    sql_generator = get_sql_generator()
+    security_service = get_security_service()
     print("✅ Services initialized")
     
     # Demo queries
@@ -38,52 +91,12 @@ async def demo_basic_functionality():
     print(f"\n📊 Running {len(demo_queries)} demo queries...")
     print("=" * 50)
     
-    for i, question in enumerate(demo_queries, 1):
-        print(f"\n🔍 Query {i}: {question}")
-        print("-" * 40)
-        
-        try:
-            # Create request
-            request = QueryRequest(
-                question=question,
-                user_id="demo_user",
-                user_role="manager"
-            )
-            
-            # Extract business terms
-            terms = glossary_service.extract_business_terms(question)
-            print(f"📝 Business terms found: {[term.canonical_name for term in terms]}")
-            
-            # Generate SQL (mock - since we don't have OpenAI API key in demo)
-            print("🤖 Generating SQL...")
-            print("⚠️  Note: This is a demo - actual SQL generation requires OpenAI API key")
-            
-            # Show expected SQL from golden queries
-            if i == 1:
-                expected_sql = """
-                SELECT 
-                  DATE(s.order_date) AS day,
-                  SUM(s.revenue - s.cogs) AS gross_profit
-                FROM sales s
-                WHERE s.order_date >= current_date - INTERVAL '2 day'
-                  AND s.order_date < current_date
-                GROUP BY DATE(s.order_date)
-                ORDER BY day;
-                """
-                print(f"📋 Expected SQL:\n{expected_sql.strip()}")
-            
-            # Security check (using expected SQL)
-            if i == 1:
-                security_check = security_service.check_query_security(expected_sql.strip())
-                print(f"🔒 Security check: {security_check.level}")
-                print(f"✅ Safe to execute: {security_check.is_safe}")
-                if security_check.warnings:
-                    print(f"⚠️  Warnings: {security_check.warnings}")
-            
-            print("✅ Query processed successfully")
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
+    # Queries run concurrently; output is written once, in query order
+    results = await asyncio.gather(*[
+        _run_demo_query(i, question, glossary_service, security_service)
+        for i, question in enumerate(demo_queries, 1)
+    ])
+    sys.stdout.write("\n".join(line for lines in results for line in lines) + "\n")
     
     print("\n" + "=" * 50)
     print("🎉 Demo completed!")
@@ -99,16 +112,12 @@ def demo_glossary_exploration():
     print("\n🔍 Business Glossary Exploration")
     print("=" * 50)
     
-    glossary_service = GlossaryService()
-    glossary = glossary_service.get_glossary()
+    glossary = get_glossary_service().get_glossary()
     
     # Show categories
-    categories = {}
+    categories = defaultdict(list)
     for term in glossary.terms.values():
-        category = term.category.value
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(term.canonical_name)
+        categories[term.category.value].append(term.canonical_name)
     
     print("📚 Available business term categories:")
     for category, terms in categories.items():
@@ -140,9 +149,7 @@ def demo_security_features():
     print("\n🔒 Security Features Demo")
     print("=" * 50)
     
-    glossary_service = GlossaryService()
-    glossary = glossary_service.get_glossary()
-    security_service = SecurityService(glossary)
+    security_service = get_security_service()
     
     # Test queries
     test_queries = [
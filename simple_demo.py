@@ -1,42 +1,24 @@
 #!/usr/bin/env python3
-"""Simple demo script for BI-GPT without external dependencies."""
+"""Simple demo script for BI-GPT without database or API dependencies."""
 
 import json
 from pathlib import Path
 
+import yaml
+
+# libyaml-backed loader when available
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def load_glossary():
     """Load glossary from YAML file."""
     glossary_path = Path(__file__).parent / "data" / "business_glossary.yaml"
     
-    # Simple YAML parser for demo
     with open(glossary_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract basic info
-    lines = content.split('\n')
-    terms = []
-    tables = []
-    
-    in_terms = False
-    in_tables = False
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith('terms:'):
-            in_terms = True
-            in_tables = False
-        elif line.startswith('table_mappings:'):
-            in_terms = False
-            in_tables = True
-        elif in_terms and line.startswith('- name:') and 'canonical_name:' in line:
-            # Extract term name
-            if 'canonical_name:' in line:
-                term_name = line.split('canonical_name:')[1].strip().strip('"')
-                terms.append(term_name)
-        elif in_tables and line.startswith('sales:') or line.startswith('products:') or line.startswith('stores:') or line.startswith('orders:'):
-            table_name = line.split(':')[0]
-            tables.append(table_name)
+        data = yaml.load(f, Loader=_YAML_LOADER)
+    
+    terms = [term['canonical_name'] for term in data.get('terms', {}).values()]
+    tables = list(data.get('table_mappings', {}).keys())
     
     return terms, tables
 
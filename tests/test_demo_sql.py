@@ -0,0 +1,85 @@
+"""Tests for demo SQL matching against golden queries."""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from app.api.query import _best_golden, _load_golden
+
+GOLDEN_QUERIES_PATH = Path(__file__).parent.parent / "data" / "golden_queries.yaml"
+
+
+def reference_best_golden(queries, question_lower):
+    """Pick a golden query by scoring every query, as the original loop did."""
+    best_match = None
+    best_score = 0
+    
+    for query in queries:
+        score = 0
+        natural_lang = query.get('natural_language', '').lower()
+        business_terms = query.get('business_terms', [])
+        
+        for term in business_terms:
+            if term.lower() in question_lower:
+                score += 2
+        
+        if any(word in question_lower for word in natural_lang.split()):
+            score += 1
+        
+        if "прибыль" in question_lower and "gross_profit" in business_terms:
+            score += 3
+        elif "выручка" in question_lower and "revenue" in business_terms:
+            score += 3
+        elif "товар" in question_lower and "product" in natural_lang:
+            score += 3
+        elif "магазин" in question_lower and "store" in business_terms:
+            score += 3
+        elif "регион" in question_lower and "region" in business_terms:
+            score += 3
+        elif "клиент" in question_lower and "customer" in business_terms:
+            score += 3
+        elif "конверсия" in question_lower and "conversion" in business_terms:
+            score += 3
+        
+        if score > best_score:
+            best_score = score
+            best_match = query
+    
+    return best_match if best_score > 0 else None
+
+
+class TestGoldenDemoMatching:
+    """Test cases for golden query selection in demo mode."""
+    
+    @pytest.fixture(scope="session")
+    def golden_queries(self):
+        """Load raw golden queries from YAML."""
+        with open(GOLDEN_QUERIES_PATH, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)["queries"]
+    
+    def test_matches_reference_scoring(self, golden_queries):
+        """Test indexed matching picks the same query as scoring every query."""
+        questions = [query["natural_language"] for query in golden_queries]
+        questions += [word for question in questions for word in question.split()]
+        questions += [
+            "конверсия",
+            "сколько заказов было",
+            "Анализ прибыльности по товарам и регионам",
+            "прибыль и выручка по магазинам",
+            "клиенты",
+            "",
+            "weather tomorrow",
+        ]
+        index = _load_golden()
+        
+        for question in questions:
+            question_lower = question.lower()
+            expected = reference_best_golden(golden_queries, question_lower)
+            actual = _best_golden(index, question_lower)
+            
+            if expected is None:
+                assert actual is None, question
+            else:
+                assert actual is not None, question
+                assert actual.expected_sql == expected["expected_sql"].strip(), question
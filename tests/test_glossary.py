@@ -11,7 +11,7 @@ from app.models.glossary import Glossary, BusinessTerm, TermCategory
 class TestGlossaryService:
     """Test cases for GlossaryService."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def glossary_service(self):
         """Create glossary service instance."""
         return GlossaryService()
@@ -45,6 +45,13 @@ class TestGlossaryService:
         # Should find gross_profit term
         assert any(term.canonical_name == "gross_profit" for term in related)
     
+    def test_find_related_terms_unique(self, glossary_service):
+        """Test a term matching by synonym and description is returned once."""
+        related = glossary_service.find_related_terms("прибыль")
+        names = [term.canonical_name for term in related]
+        assert len(names) == len(set(names))
+        assert glossary_service.find_related_terms("прибыль", limit=1) == related[:1]
+    
     def test_extract_business_terms(self, glossary_service):
         """Test extracting business terms from question."""
         question = "Прибыль за последние 2 дня для всех магазинов"
@@ -60,6 +67,12 @@ class TestGlossaryService:
         # Should include customer_id columns
         assert any("customer_id" in col for col in pii_columns)
     
+    def test_pii_column_set(self, glossary_service):
+        """Test PII column set matches the PII column list."""
+        glossary = glossary_service.get_glossary()
+        assert glossary.get_pii_column_set() == frozenset(glossary.get_pii_columns())
+        assert glossary.get_pii_column_set() is glossary.get_pii_column_set()
+    
     def test_get_permitted_tables(self, glossary_service):
         """Test getting permitted tables."""
         tables = glossary_service.get_permitted_tables()
@@ -68,6 +81,30 @@ class TestGlossaryService:
         assert "products" in tables
         assert "stores" in tables
     
+    def test_counts(self, glossary_service):
+        """Test precomputed glossary counts."""
+        glossary = glossary_service.get_glossary()
+        counts = glossary_service.counts
+        
+        assert counts["terms_count"] == len(glossary.terms)
+        assert counts["table_mappings_count"] == len(glossary.table_mappings)
+        assert counts["pii_columns_count"] == len(glossary.get_pii_columns())
+        assert counts["permitted_tables_count"] == len(glossary.get_permitted_tables())
+    
+    def test_glossary_cached_until_file_changes(self, glossary_service, tmp_path):
+        """Test parsed glossary is shared until the file changes."""
+        path = tmp_path / "glossary.yaml"
+        path.write_text(Path(glossary_service.glossary_path).read_text(encoding="utf-8"), encoding="utf-8")
+        
+        first = GlossaryService(str(path)).get_glossary()
+        assert GlossaryService(str(path)).get_glossary() is first
+        
+        data = yaml.safe_load(path.read_text(encoding="utf-8"))
+        data["version"] = "2.0"
+        path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+        
+        assert GlossaryService(str(path)).get_glossary().version == "2.0"
+    
     def test_build_context_for_llm(self, glossary_service):
         """Test building context for LLM."""
         question = "Прибыль за последние 2 дня"
@@ -1,26 +1,49 @@
 """Tests for golden queries validation."""
 
+from functools import lru_cache
+from pathlib import Path
+
 import pytest
 import yaml
-from pathlib import Path
 
 from app.services.glossary_service import GlossaryService
 from app.services.sql_generator import SQLGenerator
 from app.services.security_service import SecurityService
 from app.models.query import QueryRequest
+from app.models.security import PIIFlag
+
+# libyaml-backed loader when available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+GOLDEN_QUERIES_PATH = Path(__file__).parent.parent / "data" / "golden_queries.yaml"
+
+
+@lru_cache(maxsize=1)
+def load_golden_queries():
+    """Load golden queries from YAML once per process."""
+    with open(GOLDEN_QUERIES_PATH, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=YAML_LOADER)
+
+
+def golden_query_id(query):
+    """Use the golden query ID as the parametrized test ID."""
+    return query["id"]
 
 
 class TestGoldenQueries:
     """Test cases for golden queries validation."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def golden_queries(self):
         """Load golden queries from YAML."""
-        queries_path = Path(__file__).parent.parent / "data" / "golden_queries.yaml"
-        with open(queries_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_golden_queries()
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
+    def golden_queries_by_id(self, golden_queries):
+        """Index golden queries by ID."""
+        return {q["id"]: q for q in golden_queries["queries"]}
+    
+    @pytest.fixture(scope="session")
     def services(self):
         """Initialize services."""
         glossary_service = GlossaryService()
@@ -50,10 +73,10 @@ class TestGoldenQueries:
         {"id": "revenue_monthly", "difficulty": "easy"},
         {"id": "gross_margin_regional", "difficulty": "medium"},
     ])
-    def test_basic_queries(self, query_data, golden_queries, services):
+    def test_basic_queries(self, query_data, golden_queries_by_id, services):
         """Test basic golden queries."""
         # Find query by ID
-        query = next((q for q in golden_queries["queries"] if q["id"] == query_data["id"]), None)
+        query = golden_queries_by_id.get(query_data["id"])
         assert query is not None
         
         # Create request
@@ -78,44 +101,54 @@ class TestGoldenQueries:
         )
         assert security_check.is_safe
     
-    def test_business_terms_extraction(self, golden_queries, services):
+    @pytest.mark.parametrize("query", load_golden_queries()["queries"][:5], ids=golden_query_id)
+    def test_business_terms_extraction(self, query, services):
         """Test business terms extraction from golden queries."""
-        for query in golden_queries["queries"][:5]:  # Test first 5 queries
-            question = query["natural_language"]
-            terms = services["glossary_service"].extract_business_terms(question)
-            
-            # Should find at least one business term
-            assert len(terms) > 0, f"No business terms found for: {question}"
-            
-            # Check that expected business terms are found
-            expected_terms = query.get("business_terms", [])
-            found_terms = [term.canonical_name for term in terms]
-            
-            for expected_term in expected_terms:
-                assert expected_term in found_terms, f"Expected term {expected_term} not found for: {question}"
+        question = query["natural_language"]
+        terms = services["glossary_service"].extract_business_terms(question)
+        
+        # Should find at least one business term
+        assert len(terms) > 0, f"No business terms found for: {question}"
+        
+        # Check that expected business terms are found
+        expected_terms = query.get("business_terms", [])
+        found_terms = [term.canonical_name for term in terms]
+        
+        for expected_term in expected_terms:
+            assert expected_term in found_terms, f"Expected term {expected_term} not found for: {question}"
     
     def test_table_usage_validation(self, golden_queries, services):
         """Test that queries use only permitted tables."""
-        permitted_tables = services["glossary_service"].get_permitted_tables()
+        permitted_tables = frozenset(services["glossary_service"].get_permitted_tables())
         
         for query in golden_queries["queries"]:
-            expected_tables = query.get("tables_used", [])
-            
-            for table in expected_tables:
-                assert table in permitted_tables, f"Table {table} not in permitted tables for query: {query['id']}"
+            missing = set(query.get("tables_used", [])) - permitted_tables
+            assert not missing, f"Tables {sorted(missing)} not in permitted tables for query: {query['id']}"
     
-    def test_sql_syntax_validation(self, golden_queries, services):
+    @pytest.mark.parametrize("query", load_golden_queries()["queries"][:3], ids=golden_query_id)
+    def test_sql_syntax_validation(self, query, services):
         """Test SQL syntax validation for expected queries."""
-        for query in golden_queries["queries"][:3]:  # Test first 3 queries
-            expected_sql = query["expected_sql"].strip()
-            
-            # Basic syntax checks
-            assert expected_sql.upper().startswith("SELECT"), f"Query {query['id']} doesn't start with SELECT"
-            assert ";" in expected_sql, f"Query {query['id']} doesn't end with semicolon"
-            
-            # Security check
-            security_check = services["security_service"].check_query_security(expected_sql)
-            assert security_check.is_safe, f"Expected SQL for {query['id']} failed security check"
+        expected_sql = query["expected_sql"].strip()
+        
+        # Basic syntax checks
+        assert expected_sql.upper().startswith("SELECT"), f"Query {query['id']} doesn't start with SELECT"
+        assert ";" in expected_sql, f"Query {query['id']} doesn't end with semicolon"
+        
+        # Security check
+        security_check = services["security_service"].check_query_security(expected_sql)
+        assert security_check.is_safe, f"Expected SQL for {query['id']} failed security check"
+    
+    def test_all_expected_sql_safe(self, golden_queries, services):
+        """Test every expected SQL passes the security check apart from PII flags."""
+        queries = golden_queries["queries"]
+        checks = services["security_service"].check_many([query["expected_sql"].strip() for query in queries])
+        
+        # Queries counting customers reference PII columns and are flagged by design
+        unsafe = [
+            query["id"] for query, check in zip(queries, checks)
+            if not check.is_safe and check.pii_flag == PIIFlag.NONE
+        ]
+        assert not unsafe, f"Expected SQL failed security check: {unsafe}"
     
     def test_query_categories(self, golden_queries):
         """Test that queries have valid categories."""
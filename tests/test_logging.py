@@ -0,0 +1,74 @@
+"""Tests for structured loggers."""
+
+import logging
+
+import pytest
+
+from app.core.logging import STRUCTLOG_AVAILABLE, AuditLogger, QueryLogger
+
+
+class RecordingLogger:
+    """Logger without ``isEnabledFor``, like structlog's default wrapper."""
+
+    def __init__(self):
+        self.events = []
+
+    def info(self, event, **kwargs):
+        self.events.append(event)
+
+    def warning(self, event, **kwargs):
+        self.events.append(event)
+
+
+class TestStructlogLevelCheck:
+    """Test cases for level checks in structlog logging methods."""
+
+    @pytest.fixture
+    def query_logger(self):
+        """Create query logger recording events, restoring the level after."""
+        query_logger = QueryLogger()
+        query_logger.logger = RecordingLogger()
+        yield query_logger
+        logging.getLogger("query").setLevel(logging.NOTSET)
+
+    def test_enabled_level_emits(self, query_logger):
+        """Test events at an enabled level are emitted."""
+        logging.getLogger("query").setLevel(logging.INFO)
+        query_logger.refresh_level()
+
+        query_logger._log_query_start_structlog("req-1", "user-1", "Прибыль за неделю")
+
+        assert query_logger.logger.events == ["query_started"]
+
+    def test_disabled_level_skipped(self, query_logger):
+        """Test events below the stdlib logger's level are skipped."""
+        logging.getLogger("query").setLevel(logging.WARNING)
+        query_logger.refresh_level()
+
+        query_logger._log_query_start_structlog("req-1", "user-1", "Прибыль за неделю")
+        query_logger._log_pii_incident_structlog("req-1", "user-1", ["sales.customer_id"])
+
+        assert query_logger.logger.events == ["pii_incident"]
+
+    def test_flags_cached_until_refresh(self, query_logger):
+        """Test level changes apply once the flags are refreshed."""
+        logging.getLogger("query").setLevel(logging.WARNING)
+        query_logger.refresh_level()
+        logging.getLogger("query").setLevel(logging.INFO)
+
+        assert query_logger._info_enabled is False
+        query_logger.refresh_level()
+        assert query_logger._info_enabled is True
+
+    @pytest.mark.skipif(not STRUCTLOG_AVAILABLE, reason="structlog not installed")
+    def test_unconfigured_structlog(self):
+        """Test logging works before setup_logging configures structlog."""
+        import structlog
+
+        structlog.reset_defaults()
+        query_logger = QueryLogger()
+        audit_logger = AuditLogger()
+
+        query_logger.log_query_start("req-1", "user-1", "Прибыль за неделю")
+        query_logger.log_query_error("req-1", "boom")
+        audit_logger.log_user_action("user-1", "query", "sales", {})
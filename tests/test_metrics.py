@@ -0,0 +1,169 @@
+"""Tests for metrics collector."""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.core.metrics import MetricsCollector, QueryMetrics
+
+
+def make_metrics(request_id: str, user_id: str = "alice", **overrides) -> QueryMetrics:
+    """Build query metrics with sensible defaults."""
+    values = {
+        "request_id": request_id,
+        "user_id": user_id,
+        "question": "Прибыль за неделю",
+        "sql_generated": True,
+        "sql_executed": True,
+        "execution_time_ms": 100.0,
+        "row_count": 10,
+        "confidence_score": 0.8,
+        "security_level": "safe",
+        "pii_detected": False,
+    }
+    values.update(overrides)
+    return QueryMetrics(**values)
+
+
+class TestMetricsCollector:
+    """Test cases for MetricsCollector."""
+
+    @pytest.fixture
+    def collector(self):
+        """Create metrics collector instance."""
+        return MetricsCollector(max_history=5)
+
+    def test_empty_collector(self, collector):
+        """Test getters on an empty collector."""
+        assert collector.get_overall_metrics()["total_queries"] == 0
+        assert collector.get_user_metrics("nobody")["avg_confidence"] == 0.0
+        assert collector.get_performance_metrics()["p95_execution_time"] == 0.0
+        assert collector.get_recent_queries() == []
+
+    def test_user_metrics(self, collector):
+        """Test per-user aggregates."""
+        collector.record_query(make_metrics("r1", confidence_score=0.6, execution_time_ms=100.0))
+        collector.record_query(make_metrics("r2", confidence_score=1.0, execution_time_ms=300.0,
+                                            sql_executed=False, error_message="boom", pii_detected=True))
+        collector.record_query(make_metrics("r3", user_id="bob"))
+
+        user = collector.get_user_metrics("alice")
+
+        assert user["total_queries"] == 2
+        assert user["successful_queries"] == 1
+        assert user["failed_queries"] == 1
+        assert user["pii_incidents"] == 1
+        assert user["total_execution_time"] == pytest.approx(400.0)
+        assert user["avg_confidence"] == pytest.approx(0.8)
+
+    def test_hourly_stats(self, collector):
+        """Test current hour bucket aggregates."""
+        collector.record_query(make_metrics("r1", execution_time_ms=100.0))
+        collector.record_query(make_metrics("r2", execution_time_ms=300.0, sql_executed=False))
+
+        stats = collector.get_hourly_stats(hours=3)
+        current = stats[-1]
+
+        assert len(stats) == 3
+        assert current["queries_count"] == 2
+        assert current["success_rate"] == pytest.approx(0.5)
+        assert current["avg_execution_time"] == pytest.approx(200.0)
+        assert stats[0]["queries_count"] == 0
+
+    def test_hourly_slot_recycled(self):
+        """Test an old hour sharing a ring slot is not reported as current."""
+        collector = MetricsCollector(max_hours=3)
+        now = time.time()
+        collector.record_query(make_metrics("r1", timestamp=now - 3 * 3600))
+        collector.record_query(make_metrics("r2", timestamp=now - 3600))
+        collector.record_query(make_metrics("r3", timestamp=now))
+
+        stats = collector.get_hourly_stats(hours=3)
+
+        assert [s["queries_count"] for s in stats] == [0, 1, 1]
+        assert stats[-1]["hour"] == datetime.utcfromtimestamp(now).strftime("%Y-%m-%d-%H")
+
+    def test_overall_metrics_respect_history_limit(self, collector):
+        """Test overall aggregates only cover retained history."""
+        for i in range(7):
+            collector.record_query(make_metrics(f"r{i}", pii_detected=i < 2))
+
+        overall = collector.get_overall_metrics()
+
+        assert overall["total_queries"] == 5
+        assert overall["pii_incidents"] == 0
+        assert overall["success_rate"] == pytest.approx(1.0)
+
+    def test_security_metrics(self, collector):
+        """Test security aggregates."""
+        collector.record_query(make_metrics("r1", security_level="blocked", sql_executed=False))
+        collector.record_query(make_metrics("r2", security_level="dangerous", pii_detected=True))
+        collector.record_query(make_metrics("r3"))
+
+        security = collector.get_security_metrics()
+
+        assert security["total_queries"] == 3
+        assert security["pii_incidents"] == 1
+        assert security["security_violations"] == 2
+        assert security["blocked_queries"] == 1
+
+    def test_performance_metrics(self, collector):
+        """Test latency aggregates skip unexecuted queries."""
+        for i, ms in enumerate([100.0, 200.0, 6000.0]):
+            collector.record_query(make_metrics(f"r{i}", execution_time_ms=ms))
+        collector.record_query(make_metrics("r3", execution_time_ms=9000.0, sql_executed=False))
+
+        performance = collector.get_performance_metrics()
+
+        assert performance["avg_execution_time"] == pytest.approx(2100.0)
+        assert performance["p99_execution_time"] == pytest.approx(6000.0)
+        assert performance["slow_queries_count"] == 1
+
+    def test_percentiles_follow_history_window(self):
+        """Test percentiles drop latencies evicted from history."""
+        collector = MetricsCollector(max_history=100)
+        for i in range(200):
+            collector.record_query(make_metrics(f"r{i}", execution_time_ms=float(i)))
+
+        performance = collector.get_performance_metrics()
+
+        assert performance["p95_execution_time"] == pytest.approx(195.0)
+        assert performance["p99_execution_time"] == pytest.approx(199.0)
+        assert performance["avg_execution_time"] == pytest.approx(149.5)
+
+    def test_recent_queries(self, collector):
+        """Test recent queries are returned oldest first."""
+        for i in range(4):
+            collector.record_query(make_metrics(f"r{i}"))
+
+        recent = collector.get_recent_queries(limit=2)
+
+        assert [q["request_id"] for q in recent] == ["r2", "r3"]
+        assert recent[0]["success"] is True
+
+    def test_record_queries_batch(self, collector):
+        """Test batched recording matches one-by-one recording."""
+        batch = [make_metrics(f"r{i}", execution_time_ms=float(i)) for i in range(3)]
+        collector.record_queries(batch)
+
+        assert collector.get_overall_metrics()["total_queries"] == 3
+        assert collector.get_user_metrics("alice")["total_execution_time"] == pytest.approx(3.0)
+
+    def test_submit_through_worker(self, collector):
+        """Test submitted metrics are recorded by the background worker."""
+        async def scenario():
+            worker = asyncio.create_task(collector.run_worker())
+            await asyncio.sleep(0)
+            collector.submit(make_metrics("r1"))
+            collector.submit(make_metrics("r2"))
+            worker.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await worker
+
+        asyncio.run(scenario())
+
+        assert collector.get_overall_metrics()["total_queries"] == 2
+        collector.submit(make_metrics("r3"))
+        assert collector.get_overall_metrics()["total_queries"] == 3
@@ -0,0 +1,51 @@
+"""Tests for query cache."""
+
+import time
+
+import pytest
+
+from app.services.query_cache import QueryCache
+
+
+class TestQueryCache:
+    """Test cases for QueryCache."""
+    
+    @pytest.fixture
+    def query_cache(self):
+        """Create in-memory query cache instance."""
+        cache = QueryCache(ttl_seconds=60)
+        cache._client = None
+        return cache
+    
+    def test_miss_then_hit(self, query_cache):
+        """Test stored entries are returned."""
+        assert query_cache.get("manager", "Прибыль за неделю") is None
+        
+        query_cache.set("manager", "Прибыль за неделю", {"sql": "SELECT 1", "confidence": 0.9})
+        cached = query_cache.get("manager", "Прибыль за неделю")
+        
+        assert cached == {"sql": "SELECT 1", "confidence": 0.9}
+    
+    def test_key_normalization(self, query_cache):
+        """Test questions are normalized and roles are kept apart."""
+        assert QueryCache.make_key("manager", "  Выручка ") == QueryCache.make_key("manager", "выручка")
+        assert QueryCache.make_key("manager", "выручка") != QueryCache.make_key("analyst", "выручка")
+    
+    def test_connects_lazily(self):
+        """Test Redis is not contacted until the cache is first used."""
+        cache = QueryCache(ttl_seconds=60, redis_url="redis://127.0.0.1:1/0")
+        connects = []
+        cache._connect = connects.append
+        assert connects == []
+        
+        cache.set("manager", "выручка", {"sql": "SELECT 1"})
+        assert cache.get("manager", "выручка") == {"sql": "SELECT 1"}
+        assert connects == ["redis://127.0.0.1:1/0"]
+    
+    def test_expired_entry(self, query_cache):
+        """Test expired entries are dropped."""
+        query_cache.ttl = 0.0001
+        query_cache.set("manager", "выручка", {"sql": "SELECT 1"})
+        time.sleep(0.01)
+        
+        assert query_cache.get("manager", "выручка") is None
@@ -3,6 +3,7 @@
 import pytest
 
 from app.services.security_service import SecurityService
+from app.services.sql_parser import SQLGLOT_AVAILABLE
 from app.models.glossary import Glossary
 from app.models.security import SecurityLevel, PIIFlag
 
@@ -10,7 +11,7 @@ from app.models.security import SecurityLevel, PIIFlag
 class TestSecurityService:
     """Test cases for SecurityService."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def glossary(self):
         """Create test glossary."""
         return Glossary(
@@ -31,7 +32,10 @@ class TestSecurityService:
     
     @pytest.fixture
     def security_service(self, glossary):
-        """Create security service instance."""
+        """Create security service instance.
+        
+        Function scoped: tests inspect and resize its check cache.
+        """
         return SecurityService(glossary)
     
     def test_safe_query(self, security_service):
@@ -68,6 +72,99 @@ class TestSecurityService:
         assert check.pii_flag == PIIFlag.DETECTED
         assert check.level == SecurityLevel.DANGEROUS
     
+    @pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+    def test_literals_and_comments_ignored(self, security_service):
+        """Test warning and PII patterns inside strings and comments are not flagged."""
+        sql = "SELECT revenue FROM sales WHERE note = 'select * from stores' -- sales.customer_id"
+        check = security_service.check_query_security(sql)
+        
+        assert check.level == SecurityLevel.SAFE
+        assert check.warnings == []
+        assert check.pii_flag == PIIFlag.NONE
+    
+    def test_dangerous_keywords_in_literals_blocked(self, security_service):
+        """Test dangerous operations are blocked even inside quotes and comments."""
+        queries = [
+            "SELECT $$ ; DROP TABLE sales; $$ FROM sales",
+            "SELECT 1 FROM sales /* a /* b */ DROP TABLE sales; */",
+            "SELECT revenue FROM sales -- drop later",
+        ]
+        
+        for sql in queries:
+            check = security_service.check_query_security(sql)
+            assert check.level == SecurityLevel.BLOCKED, sql
+            assert check.is_safe is False, sql
+    
+    def test_comment_between_keywords_blocked(self, security_service):
+        """Test comments cannot split dangerous keyword sequences."""
+        check = security_service.check_query_security("SELECT revenue FROM sales UNION/**/SELECT 1")
+        
+        assert check.level == SecurityLevel.BLOCKED
+    
+    @pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+    def test_pii_access_through_alias(self, security_service):
+        """Test PII columns are resolved through table aliases."""
+        check = security_service.check_query_security("SELECT s.customer_id FROM sales s")
+        
+        assert check.pii_flag == PIIFlag.DETECTED
+    
+    @pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+    def test_counted_pii_column_detected(self, security_service):
+        """Test counting PII values is still PII access."""
+        for sql in ["SELECT COUNT(s.customer_id) FROM sales s", "SELECT COUNT(DISTINCT s.customer_id) FROM sales s"]:
+            check = security_service.check_query_security(sql)
+            assert check.pii_flag == PIIFlag.DETECTED, sql
+            assert check.is_safe is False, sql
+    
+    @pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+    def test_pii_expression_inside_count_detected(self, security_service):
+        """Test PII columns in expressions inside COUNT are still flagged."""
+        queries = [
+            "SELECT COUNT(CASE WHEN s.customer_id = 42 THEN 1 END) FROM sales s",
+            "SELECT COUNT(*) FILTER (WHERE s.customer_id = 42) FROM sales s",
+            "SELECT COUNT(s.customer_id + 0) FROM sales s",
+            "SELECT COUNT(DISTINCT LOWER(s.customer_id)) FROM sales s",
+        ]
+        
+        for sql in queries:
+            check = security_service.check_query_security(sql)
+            assert check.pii_flag == PIIFlag.DETECTED, sql
+            assert check.is_safe is False, sql
+    
+    @pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+    def test_non_select_statement_blocked(self, security_service):
+        """Test statements no pattern covers are blocked by type."""
+        check = security_service.check_query_security("VACUUM sales")
+        
+        assert check.level == SecurityLevel.BLOCKED
+        assert check.blocked_operations == ["Non-SELECT statement: COMMAND"]
+    
+    def test_check_results_cached(self, security_service):
+        """Test repeated checks reuse the cached result."""
+        sql = "SELECT SUM(revenue) FROM sales"
+        first = security_service.check_query_security(sql)
+        
+        assert security_service.check_query_security(sql) is first
+        assert security_service.check_query_security(sql, user_role="analyst") is not first
+    
+    def test_check_many(self, security_service):
+        """Test batch checks match single checks, in order."""
+        sqls = ["SELECT SUM(revenue) FROM sales", "DELETE FROM sales", "SELECT SUM(revenue) FROM sales"]
+        checks = security_service.check_many(sqls)
+        
+        assert [check.level for check in checks] == [SecurityLevel.SAFE, SecurityLevel.BLOCKED, SecurityLevel.SAFE]
+        assert checks[0] is checks[2]
+        assert checks[1] == security_service.check_query_security("DELETE FROM sales")
+    
+    def test_check_cache_bounded(self, security_service):
+        """Test cache evicts least recently used entries."""
+        security_service.CHECK_CACHE_SIZE = 2
+        for i in range(3):
+            security_service.check_query_security(f"SELECT {i} FROM sales")
+        
+        assert len(security_service._check_cache) == 2
+        assert ("SELECT 0 FROM sales", "manager") not in security_service._check_cache
+    
     def test_warning_patterns(self, security_service):
         """Test warning patterns are flagged."""
         sql = "SELECT * FROM sales ORDER BY 1 LIMIT 10000"
@@ -107,4 +204,9 @@ class TestSecurityService:
         
         assert len(valid_tables) == 0
         assert len(invalid_tables) > 0
-        assert "unauthorized_table" in invalid_tables
\ No newline at end of file
+        assert "unauthorized_table" in invalid_tables
+    
+    @pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+    def test_validate_qualified_table_access(self, security_service):
+        """Test schema-qualified tables are checked by table name."""
+        assert security_service.validate_table_access("SELECT * FROM pg_catalog.pg_user") == ["pg_user"]
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Tests for SQL generator response handling."""
+
+import pytest
+
+from app.services.glossary_service import GlossaryService
+from app.services.sql_generator import SQLGenerator
+
+
+class TestParseLLMResponse:
+    """Test cases for SQLGenerator._parse_llm_response."""
+    
+    @pytest.fixture
+    def generator(self):
+        """Create SQL generator over the default glossary."""
+        return SQLGenerator(GlossaryService().get_glossary())
+    
+    def test_marked_sql(self, generator):
+        """Test SQL between markers is extracted."""
+        result = generator._parse_llm_response("Here:\n<<<SQL>>>\nSELECT revenue FROM sales;\n<<<SQL>>>")
+        
+        assert result["sql"] == "SELECT revenue FROM sales;"
+        assert result["needs_clarification"] is False
+    
+    def test_unmarked_sql_until_semicolon(self, generator):
+        """Test unmarked SQL runs from the SELECT line to the semicolon."""
+        result = generator._parse_llm_response(
+            "Sure.\n  select region, SUM(revenue)\n  FROM sales\n  GROUP BY region;\nDone"
+        )
+        
+        assert result["sql"] == "select region, SUM(revenue)\n  FROM sales\n  GROUP BY region;"
+    
+    def test_unmarked_sql_semicolon_in_literal(self, generator):
+        """Test a semicolon inside a line does not end unmarked SQL."""
+        result = generator._parse_llm_response(
+            "SELECT revenue\nFROM sales WHERE note = 'a;b'\n  AND region = 'north';  \nDone"
+        )
+        
+        assert result["sql"] == "SELECT revenue\nFROM sales WHERE note = 'a;b'\n  AND region = 'north';"
+    
+    def test_unmarked_sql_until_blank_line(self, generator):
+        """Test unmarked SQL stops at a blank line."""
+        result = generator._parse_llm_response("SELECT revenue\nFROM sales\n\nThis sums revenue.")
+        
+        assert result["sql"] == "SELECT revenue\nFROM sales"
+    
+    def test_clarification(self, generator):
+        """Test clarification JSON is recognised."""
+        result = generator._parse_llm_response('{"clarify": true, "questions": ["Which period?"]}')
+        
+        assert result["needs_clarification"] is True
+        assert result["clarification_questions"] == ["Which period?"]
+    
+    def test_no_sql(self, generator):
+        """Test responses without SQL report an error."""
+        result = generator._parse_llm_response("I cannot answer that.")
+        
+        assert result["sql"] is None
+        assert "error" in result
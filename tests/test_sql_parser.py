@@ -0,0 +1,53 @@
+"""Tests for SQL parsing helpers."""
+
+import pytest
+
+from app.services.sql_parser import SQLGLOT_AVAILABLE, analyze_sql, strip_literals
+
+
+@pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+class TestAnalyzeSQL:
+    """Test cases for analyze_sql."""
+    
+    def test_select_facts(self):
+        """Test tables, columns and filters are collected."""
+        parsed = analyze_sql(
+            "SELECT st.region, SUM(s.revenue) AS total_revenue, COUNT(*) "
+            "FROM sales s JOIN stores st ON s.store_id = st.store_id "
+            "WHERE s.order_date >= '2024-07-01' GROUP BY st.region"
+        )
+        
+        assert parsed.is_select is True
+        assert parsed.tables == ("sales", "stores")
+        assert parsed.columns == ("region", "total_revenue", "COUNT(*)")
+        assert parsed.where == "s.order_date >= '2024-07-01'"
+    
+    def test_non_select(self):
+        """Test write statements are not reported as selects."""
+        assert analyze_sql("DELETE FROM sales").is_select is False
+    
+    def test_unparsable(self):
+        """Test unparsable SQL yields None."""
+        assert analyze_sql("SELECT FROM WHERE (") is None
+    
+    def test_cached(self):
+        """Test the same SQL is analyzed once."""
+        sql = "SELECT revenue FROM sales"
+        assert analyze_sql(sql) is analyze_sql(sql)
+
+
+@pytest.mark.skipif(not SQLGLOT_AVAILABLE, reason="sqlglot not installed")
+class TestStripLiterals:
+    """Test cases for strip_literals."""
+    
+    def test_strings_and_comments_removed(self):
+        """Test literal bodies are blanked and comments dropped."""
+        sql = "SELECT id /* note */ FROM t WHERE s = 'it''s DROP' -- DELETE\nAND n=1"
+        
+        assert strip_literals(sql) == "SELECT id FROM t WHERE s = '' AND n=1"
+    
+    def test_untokenizable_sql_unchanged(self):
+        """Test SQL the tokenizer rejects is returned as is."""
+        sql = "SELECT 'unterminated"
+        
+        assert strip_literals(sql) == sql